@@ -1,39 +1,151 @@
 import os
+import threading
 from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, storage
-from supabase import create_client, Client
 
 load_dotenv()
 
+# Firebase and Supabase clients are created on first use: their SDKs are slow to
+# import, and a worker should pass its health check before any of them is needed
+_client_lock = threading.Lock()
+_firebase_app = None
+_supabase = None
+
 # Firebase Configuration
 # Expects per-environment service account or default credentials
-if not firebase_admin._apps:
-    try:
-        # In production, use environment variables or a specific path
-        cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
-        if cred_path and os.path.exists(cred_path):
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred, {
-                'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET")
-            })
-        else:
-            # Fallback or default init (e.g. for simple local testing if already authed)
-            firebase_admin.initialize_app(options={
-                'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET")
-            })
-    except Exception as e:
-        print(f"Warning: Firebase initialization failed: {e}")
+def get_firebase_app():
+    """
+    The default Firebase app, initialized on the first call. None if initialization failed.
+    """
+    global _firebase_app
+    with _client_lock:
+        if _firebase_app is not None:
+            return _firebase_app
+        import firebase_admin
+        from firebase_admin import credentials
+        if firebase_admin._apps:
+            _firebase_app = firebase_admin.get_app()
+            return _firebase_app
+        try:
+            # In production, use environment variables or a specific path
+            cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+            if cred_path and os.path.exists(cred_path):
+                cred = credentials.Certificate(cred_path)
+                _firebase_app = firebase_admin.initialize_app(cred, {
+                    'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET")
+                })
+            else:
+                # Fallback or default init (e.g. for simple local testing if already authed)
+                _firebase_app = firebase_admin.initialize_app(options={
+                    'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET")
+                })
+        except Exception as e:
+            print(f"Warning: Firebase initialization failed: {e}")
+        return _firebase_app
 
 # Supabase Configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_CONFIGURED = bool(SUPABASE_URL and SUPABASE_KEY)
 
-supabase: Client = None
-if SUPABASE_URL and SUPABASE_KEY:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-else:
+if not SUPABASE_CONFIGURED:
     print("Warning: Supabase credentials not found in environment variables.")
 
+def get_supabase():
+    """
+    The Supabase client, created on the first call. None if credentials are missing.
+    """
+    global _supabase
+    if not SUPABASE_CONFIGURED:
+        return None
+    with _client_lock:
+        if _supabase is None:
+            from supabase import create_client
+            _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        return _supabase
+
 # Gemini Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Upper bound for a single LLM round-trip before the request is abandoned
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# Run resume analysis speculatively alongside validation (costs two wasted calls on non-resumes)
+SPECULATIVE_RESUME_ANALYSIS = os.getenv("SPECULATIVE_RESUME_ANALYSIS", "true").lower() == "true"
+
+# Stream interviewer replies sentence by sentence (clients can opt out with ?stream=false)
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
+# TTS audio cache: in-memory LRU budget, plus an optional directory for a persistent disk tier
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or None
+
+# Where interview sessions live: "memory" (single process), "sqlite:///sessions.db" or "redis://host:6379/0"
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "memory")
+
+# Session lifetime: idle/absolute TTLs, grace period after /end-interview, and a per-worker cap (LRU eviction)
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", str(30 * 60)))
+SESSION_MAX_AGE_SECONDS = float(os.getenv("SESSION_MAX_AGE_SECONDS", str(3 * 60 * 60)))
+SESSION_ENDED_TTL_SECONDS = float(os.getenv("SESSION_ENDED_TTL_SECONDS", str(5 * 60)))
+SESSION_REAP_INTERVAL_SECONDS = float(os.getenv("SESSION_REAP_INTERVAL_SECONDS", "60"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "500"))
+
+# Resume PDF limits: upload size, pages read, text kept, and per-file parse time in the worker pool
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(5 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "20000"))
+PDF_PARSE_TIMEOUT_SECONDS = float(os.getenv("PDF_PARSE_TIMEOUT_SECONDS", "10"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+
+# Resume analysis cache (keyed on PDF hash + model): entry/size bounds and time-to-live
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+# Model context per turn: exchanges kept verbatim, and how many evicted ones are summarized at once
+CONTEXT_WINDOW_TURNS = int(os.getenv("CONTEXT_WINDOW_TURNS", "6"))
+CONTEXT_FOLD_BATCH_TURNS = int(os.getenv("CONTEXT_FOLD_BATCH_TURNS", "4"))
+
+# Report card notes: assess the transcript in the background every N exchanges
+REPORT_SEGMENT_TURNS = int(os.getenv("REPORT_SEGMENT_TURNS", "4"))
+
+# LLM scheduler: concurrent calls per worker, request rate (token bucket; 0 = no rate limit), slots kept free for live turns, retries
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "30"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+LLM_RESERVED_INTERACTIVE = int(os.getenv("LLM_RESERVED_INTERACTIVE", "2"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# Model and TTS backends: "gemini"/"edge" for real traffic, "fake" for deterministic local stand-ins
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+TTS_BACKEND = os.getenv("TTS_BACKEND", "edge")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "500"))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+FAKE_TTS_LATENCY_MS = float(os.getenv("FAKE_TTS_LATENCY_MS", "200"))
+
+# TTS audio sent to clients that don't ask for a format ("mp3" or "opus"); other formats are transcoded with ffmpeg
+TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "mp3")
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+# After this many transcode failures in a row a format is served as MP3 for the cooldown, then tried again
+TTS_TRANSCODE_MAX_FAILURES = int(os.getenv("TTS_TRANSCODE_MAX_FAILURES", "3"))
+TTS_TRANSCODE_COOLDOWN_SECONDS = float(os.getenv("TTS_TRANSCODE_COOLDOWN_SECONDS", "60"))
+
+# Candidate messages arriving within this window of each other are answered as one turn
+TURN_COALESCE_MS = float(os.getenv("TURN_COALESCE_MS", "300"))
+
+# Topic plan: answers per topic before moving on, and whether to prepare the next topic's question ahead of time
+TOPIC_MAX_TURNS = int(os.getenv("TOPIC_MAX_TURNS", "2"))
+QUESTION_PREFETCH = os.getenv("QUESTION_PREFETCH", "true").lower() == "true"
+
+# Finished interviews are written behind the request: "none", "jsonl:///path/file.jsonl" or "supabase://table".
+# Off by default: the frontend already saves interviews to Supabase from the browser
+PERSISTENCE_URL = os.getenv("PERSISTENCE_URL", "none")
+PERSISTENCE_BATCH_SIZE = int(os.getenv("PERSISTENCE_BATCH_SIZE", "20"))
+PERSISTENCE_FLUSH_SECONDS = float(os.getenv("PERSISTENCE_FLUSH_SECONDS", "5"))
+PERSISTENCE_MAX_RETRIES = int(os.getenv("PERSISTENCE_MAX_RETRIES", "3"))
+
+# Admission control per worker: interviews served at once, connections allowed to wait for a slot,
+# and the outbound queue bound per socket before a slow client's deltas/stale audio are shed
+MAX_ACTIVE_INTERVIEWS = int(os.getenv("MAX_ACTIVE_INTERVIEWS", "100"))
+MAX_WAITING_INTERVIEWS = int(os.getenv("MAX_WAITING_INTERVIEWS", "50"))
+WS_SEND_QUEUE_MESSAGES = int(os.getenv("WS_SEND_QUEUE_MESSAGES", "64"))
+WS_SEND_QUEUE_BYTES = int(os.getenv("WS_SEND_QUEUE_BYTES", str(1024 * 1024)))
@@ -1,18 +1,72 @@
 import os
+import time
+import secrets
+import hashlib
+import copy
+import asyncio
 import uvicorn
 import json
 from fastapi import FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-import google.generativeai as genai
-from config import GEMINI_API_KEY
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from config import (
+    GEMINI_API_KEY, LLM_TIMEOUT_SECONDS, SPECULATIVE_RESUME_ANALYSIS, STREAM_RESPONSES,
+    SESSION_STORE_URL, SESSION_IDLE_TTL_SECONDS, SESSION_MAX_AGE_SECONDS, SESSION_ENDED_TTL_SECONDS,
+    SESSION_REAP_INTERVAL_SECONDS, MAX_SESSIONS,
+    ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_TTL_SECONDS,
+    CONTEXT_WINDOW_TURNS, CONTEXT_FOLD_BATCH_TURNS, REPORT_SEGMENT_TURNS,
+    LLM_MAX_CONCURRENCY, LLM_RATE_PER_MINUTE, LLM_BURST, LLM_RESERVED_INTERACTIVE, LLM_MAX_RETRIES,
+    LLM_BACKEND, FAKE_LLM_LATENCY_MS, FAKE_LLM_TOKENS_PER_SECOND, TTS_AUDIO_FORMAT, TURN_COALESCE_MS,
+    TOPIC_MAX_TURNS, QUESTION_PREFETCH,
+    PERSISTENCE_URL, PERSISTENCE_BATCH_SIZE, PERSISTENCE_FLUSH_SECONDS, PERSISTENCE_MAX_RETRIES,
+    SUPABASE_CONFIGURED, get_supabase,
+    MAX_ACTIVE_INTERVIEWS, MAX_WAITING_INTERVIEWS, WS_SEND_QUEUE_MESSAGES, WS_SEND_QUEUE_BYTES
+)
 from services.parser import parser
-from services.tts import tts_service
-from managers.socket_manager import ConnectionManager
+from services.llm import LLMService, LazyModel, parse_json
+from services.fakes import FakeModel
+from services.scheduler import LLMScheduler, Priority
+from services.context import ConversationContext
+from services.report import ReportBuilder
+from services.topic_tracker import TopicTracker
+from services.prefetch import QuestionPrefetcher
+from services.persistence import PersistenceQueue, SupabaseSink, build_record, create_persistence_sink
+from services.cache import LRUCache
+from services.session_store import create_session_store, is_expired
+from services import prompts
+from services.prompts import PERSONA_TRAITS
+from services.tts import tts_service, SentenceBuffer, AudioFormat, NATIVE_FORMAT, detect_codec
+from services.metrics import metrics, current_session
+from managers.socket_manager import ConnectionManager, SendQueue
+from managers.session_channel import SessionChannel
+from managers.turn_queue import TurnQueue
+from managers.framing import LEGACY_PING, LEGACY_PROTOCOL, PROTOCOL_VERSION, Codec, Kind, decode_frame, encode_frame
+
+# Initialize the model: Gemini, or a deterministic local fake for development and load tests
+if LLM_BACKEND == "fake":
+    MODEL_NAME = 'fake'
+    model = FakeModel(latency=FAKE_LLM_LATENCY_MS / 1000, tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND)
+else:
+    # Using gemma-3-1b-it - works without quota issues
+    MODEL_NAME = 'gemma-3-1b-it'
 
-# Initialize Gemini
-genai.configure(api_key=GEMINI_API_KEY)
-# Using gemma-3-1b-it - works without quota issues
-model = genai.GenerativeModel('gemma-3-1b-it')
+    def create_gemini_model():
+        # google.generativeai takes about a second to import, so it is loaded after startup
+        import google.generativeai as genai
+        genai.configure(api_key=GEMINI_API_KEY)
+        return genai.GenerativeModel(MODEL_NAME)
+
+    model = LazyModel(create_gemini_model)
+# All model calls go through the async client so a slow reply never blocks other sockets,
+# and through one scheduler so live turns always get capacity before background work
+scheduler = LLMScheduler(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    rate_per_minute=LLM_RATE_PER_MINUTE,
+    burst=LLM_BURST,
+    reserved_interactive=LLM_RESERVED_INTERACTIVE,
+    max_retries=LLM_MAX_RETRIES
+)
+llm = LLMService(model, scheduler, timeout=LLM_TIMEOUT_SECONDS)
 
 app = FastAPI()
 
@@ -25,11 +79,214 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-manager = ConnectionManager()
+# Caps concurrent interviews on this worker; the rest wait in line (see managers/socket_manager.py)
+manager = ConnectionManager(
+    max_active=MAX_ACTIVE_INTERVIEWS,
+    max_waiting=MAX_WAITING_INTERVIEWS,
+    send_queue_messages=WS_SEND_QUEUE_MESSAGES,
+    send_queue_bytes=WS_SEND_QUEUE_BYTES
+)
+
+# Next-topic questions prepared while the candidate is answering (see services/prefetch.py)
+prefetcher = QuestionPrefetcher(llm, tts_service)
+
+# Finished interviews (transcript, report, code) are queued and written to the store in batches
+persistence_sink = create_persistence_sink(PERSISTENCE_URL, get_supabase if SUPABASE_CONFIGURED else None)
+persistence = PersistenceQueue(
+    persistence_sink,
+    batch_size=PERSISTENCE_BATCH_SIZE,
+    flush_interval=PERSISTENCE_FLUSH_SECONDS,
+    max_retries=PERSISTENCE_MAX_RETRIES
+) if persistence_sink else None
+
+# Resume analysis results keyed on PDF content hash, so re-uploads skip parsing and the LLM
+analysis_cache = LRUCache(
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    max_bytes=ANALYSIS_CACHE_MAX_BYTES,
+    ttl=ANALYSIS_CACHE_TTL_SECONDS,
+    sizeof=lambda entry: sum(len(str(value)) for value in entry.values())
+)
+
+# Session data lives in a pluggable store (in-memory by default, SQLite/Redis to share
+# sessions between workers). sessionId -> { resume_text, analysis, context, ... }
+session_store = create_session_store(SESSION_STORE_URL, max_sessions=MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL_SECONDS)
+# Session dicts this worker has run interviews on, with their runtime objects (replay
+# channel, running turns). Shared stores hand back a fresh copy on every get, so
+# without these a reconnect to the same worker would lose its replay buffer.
+live_sessions = {}
+
+async def load_session(session_id: str):
+    """
+    The session as stored, or this worker's live copy of it if that is still the
+    latest. A copy another worker has saved over since is dropped.
+    """
+    stored = await session_store.get(session_id)
+    live = live_sessions.get(session_id)
+    if stored is None:
+        live_sessions.pop(session_id, None)
+        return None
+    if live is not None and live.get("last_active", 0) >= stored.get("last_active", 0):
+        return live
+    live_sessions.pop(session_id, None)
+    return stored
 
-# Store session data in memory for MVP (use Redis/Supabase in prod)
-# sessionId -> { resume_text: str, chat_session: ChatSession }
-sessions = {}
+@app.on_event("startup")
+async def prewarm_tts_cache():
+    # Greetings are fixed per persona, so synthesize them once in the background
+    # and every session's first audio is a cache hit
+    app.state.tts_prewarm = asyncio.create_task(tts_service.prewarm([t["greeting"] for t in PERSONA_TRAITS.values()]))
+
+async def warm_up(name: str, load):
+    try:
+        await asyncio.to_thread(load)
+    except Exception as e:
+        print(f"Warning: {name} warmup failed: {e}")
+
+@app.on_event("startup")
+async def warm_up_clients():
+    # Slow clients load in the background: the worker accepts requests and WebSockets
+    # right away, and a first call that beats the warmup just waits for it
+    app.state.warmups = []
+    if isinstance(model, LazyModel):
+        app.state.warmups.append(asyncio.create_task(warm_up("LLM client", model.load)))
+    if isinstance(persistence_sink, SupabaseSink):
+        app.state.warmups.append(asyncio.create_task(warm_up("Supabase client", get_supabase)))
+
+async def reap_sessions():
+    while True:
+        await asyncio.sleep(SESSION_REAP_INTERVAL_SECONDS)
+        try:
+            removed = await session_store.reap(SESSION_IDLE_TTL_SECONDS, SESSION_MAX_AGE_SECONDS, SESSION_ENDED_TTL_SECONDS)
+            now = time.time()
+            for session_id, data in list(live_sessions.items()):
+                if is_expired(data, now, SESSION_IDLE_TTL_SECONDS, SESSION_MAX_AGE_SECONDS, SESSION_ENDED_TTL_SECONDS):
+                    del live_sessions[session_id]
+            if removed:
+                print(f"Reaped {removed} expired session(s)")
+        except Exception as e:
+            print(f"Warning: session reaper failed: {e}")
+
+@app.on_event("startup")
+async def start_session_reaper():
+    app.state.session_reaper = asyncio.create_task(reap_sessions())
+
+@app.on_event("startup")
+async def start_persistence():
+    if persistence:
+        persistence.start()
+
+@app.on_event("shutdown")
+async def flush_persistence():
+    if persistence:
+        await persistence.stop()
+
+@app.get("/ready")
+async def readiness():
+    """
+    200 once this worker can run interviews, i.e. the session store answers.
+    Optional backends still warming up are reported but do not hold it back.
+    """
+    try:
+        await asyncio.wait_for(session_store.count(), timeout=2)
+        store = "ok"
+    except Exception:
+        store = "unavailable"
+    prewarm = getattr(app.state, "tts_prewarm", None)
+    body = {
+        "ready": store == "ok",
+        "session_store": store,
+        "llm": "loading" if isinstance(model, LazyModel) and not model.loaded else "ready",
+        "tts_prewarm": "done" if prewarm is not None and prewarm.done() else "running",
+        "persistence": type(persistence_sink).__name__ if persistence else "disabled",
+    }
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/sessions/stats")
+async def session_stats():
+    return await session_store.stats()
+
+@app.get("/analysis/cache")
+async def analysis_cache_stats():
+    return analysis_cache.stats()
+
+@app.get("/llm/scheduler")
+async def llm_scheduler_stats():
+    return scheduler.stats()
+
+@app.get("/tts/cache")
+async def tts_cache_stats():
+    return tts_service.stats()
+
+@app.get("/persistence/stats")
+async def persistence_stats():
+    return persistence.stats() if persistence else {"enabled": False}
+
+@app.get("/connections/stats")
+async def connection_stats():
+    return manager.stats()
+
+@app.get("/prefetch/stats")
+async def prefetch_stats():
+    return prefetcher.stats()
+
+metrics.gauge("interview_active_connections", "Interview WebSockets admitted on this worker", lambda: len(manager.active))
+metrics.gauge("interview_waiting_connections", "Interview WebSockets waiting for a slot on this worker", lambda: len(manager.waiting))
+metrics.gauge("llm_queued_requests", "LLM calls waiting for a scheduler slot", lambda: scheduler.stats()["queued"])
+metrics.gauge("tts_cache_bytes", "Bytes held by the in-memory TTS cache", lambda: tts_service.stats()["bytes"])
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # Session counts come from the store, which may be remote, so they are read per scrape.
+    # Only the count: sizes need a pass over every session and stay on /sessions/stats
+    sessions = await session_store.count()
+    return PlainTextResponse(
+        metrics.render({
+            "interview_sessions": ("Interview sessions held by the session store", sessions),
+        }),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.get("/metrics/spans")
+async def recent_spans(session_id: str = None):
+    return metrics.recent_spans(session_id)
+
+# Spoken when the model cannot answer a turn, so the candidate knows to repeat themselves
+FALLBACK_REPLY = "Sorry, I lost my train of thought for a moment. Could you say that again?"
+# Stands in for the model-written summary; the sections assessed during the interview still follow
+SUMMARY_UNAVAILABLE = "_The written summary is unavailable right now. The assessments below were made during the interview._\n"
+
+NOT_RESUME_ERROR = {
+    "error": "The uploaded file does not appear to be a resume. Please upload a valid resume/CV in PDF format.",
+    "validation_failed": True
+}
+
+def _is_resume(validation_result: str) -> bool:
+    return "NOT_RESUME" not in validation_result and "RESUME" in validation_result
+
+def _not_resume(cache_key: str) -> dict:
+    analysis_cache.set(cache_key, {"validation_failed": True})
+    return NOT_RESUME_ERROR
+
+async def create_session(resume_text: str, analysis: str, skill_gaps: str, interview_topics: list, resume_digest: str = "") -> dict:
+    # Create a session ID
+    session_id = f"session_{os.urandom(4).hex()}"
+    await session_store.save(session_id, {
+        "resume_text": resume_text,
+        "analysis": analysis,
+        "skill_gaps": skill_gaps,
+        "resume_digest": resume_digest or prompts.resume_digest(resume_text),
+        "interview_topics": copy.deepcopy(interview_topics),  # the cached copy stays untouched
+        "topics_covered": [],  # Track which topics have been covered
+        "conversation_history": [],
+        "context": None  # Bounded model context (see services/context.py), set on first connect
+    })
+    
+    return {"session_id": session_id, "analysis": analysis}
+
+# Analyses running right now, by cache key. A second upload of the same PDF (say a
+# retry after the first request's connection dropped) waits for the running one
+# instead of paying for the parse and the model calls again.
+analyses_in_flight: dict[str, asyncio.Task] = {}
 
 @app.post("/analyze-resume")
 async def analyze_resume(file: UploadFile = File(...)):
@@ -37,428 +294,571 @@ async def analyze_resume(file: UploadFile = File(...)):
         if not file.filename.endswith('.pdf'):
             return {"error": "Only PDF files are supported"}
         
-        content = await file.read()
-        resume_text = await parser.parse(content)
-        
-        if not resume_text or len(resume_text.strip()) < 10:
-            return {"error": "Could not extract text from PDF. Please ensure the PDF contains readable text."}
-        
-        # Step 1: Validate if the document is actually a resume
-        validation_prompt = f"""
-        Analyze the following document content and determine if it is a RESUME/CV or not.
-        
-        Document content:
-        {resume_text[:2000]}  # First 2000 chars for quick validation
-        
-        A resume/CV typically contains:
-        - Personal information (name, contact details)
-        - Work experience or employment history
-        - Education background
-        - Skills or competencies
-        - Sometimes: projects, certifications, achievements
-        
-        Respond with ONLY one of these two words:
-        - "RESUME" if this appears to be a resume or CV
-        - "NOT_RESUME" if this is some other type of document (research paper, article, report, random text, etc.)
-        """
-        
-        validation_response = model.generate_content(validation_prompt)
-        validation_result = validation_response.text.strip().upper()
+        # Never buffer more than the parser will accept
+        content = await file.read(parser.max_bytes + 1)
         
-        if "NOT_RESUME" in validation_result or "RESUME" not in validation_result:
-            return {
-                "error": "The uploaded file does not appear to be a resume. Please upload a valid resume/CV in PDF format.",
-                "validation_failed": True
-            }
-        
-        # Analyze with Gemini - Enhanced for Skill Gap Analysis and Topic Coverage
-        prompt = f"""
-        You are an expert technical interviewer and career coach. Analyze the following resume:
-        {resume_text}
-        
-        Provide a comprehensive analysis in the following JSON format:
-        {{
-            "key_skills": ["skill1", "skill2", ...],
-            "experience_level": "Junior/Mid/Senior/Lead",
-            "skill_gaps": {{
-                "missing_technologies": ["tech1", "tech2"],
-                "weak_areas": ["area1", "area2"],
-                "recommendations": ["recommendation1", "recommendation2"]
-            }},
-            "interview_topics": [
-                {{"topic": "Topic name based on resume", "priority": "high/medium/low", "category": "technical/behavioral/project"}},
-                {{"topic": "Another topic", "priority": "medium", "category": "technical"}}
-            ],
-            "interview_focus_areas": ["area1", "area2", "area3"],
-            "strengths": ["strength1", "strength2"],
-            "career_trajectory": "brief assessment of career growth potential"
-        }}
-        
-        IMPORTANT for interview_topics:
-        - Extract 5-8 specific topics from the resume that should be covered in an interview
-        - Topics should include: key technical skills, major projects, work experiences, soft skills
-        - Assign priority: high (core skills/recent experience), medium (supporting skills), low (nice to explore)
-        - Ensure topics cover the breadth of the candidate's background
-        
-        Be specific about skill gaps - identify what modern technologies or practices might be missing.
-        Return ONLY valid JSON, no markdown or extra text.
-        """
-        
-        response = model.generate_content(prompt)
-        analysis = response.text
-        
-        # Try to extract skill gaps specifically for later use
-        skill_gaps_prompt = f"""
-        Based on this resume, list the TOP 5 skill gaps that should be addressed:
-        {resume_text}
-        
-        Return as a simple numbered list. Be specific and actionable.
-        """
-        skill_gaps_response = model.generate_content(skill_gaps_prompt)
-        skill_gaps = skill_gaps_response.text
-        
-        # Parse interview topics from analysis
-        interview_topics = []
-        try:
-            # Try to extract topics from the analysis JSON
-            analysis_json = json.loads(analysis)
-            if "interview_topics" in analysis_json:
-                interview_topics = analysis_json["interview_topics"]
-        except (json.JSONDecodeError, KeyError):
-            # Fallback: create topics from key_skills if parsing fails
-            pass
-        
-        # Create a session ID
-        session_id = f"session_{os.urandom(4).hex()}"
-        sessions[session_id] = {
-            "resume_text": resume_text,
-            "analysis": analysis,
-            "skill_gaps": skill_gaps,
-            "interview_topics": interview_topics,
-            "topics_covered": [],  # Track which topics have been covered
-            "conversation_history": [],
-            "chat": None
-        }
-        
-        return {"session_id": session_id, "analysis": analysis}
+        # Same PDF + same model -> reuse the parse and all three LLM results
+        cache_key = f"{MODEL_NAME}:{hashlib.sha256(content).hexdigest()}"
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            if cached.get("validation_failed"):
+                return NOT_RESUME_ERROR
+            return await create_session(**cached)
+
+        analysis = analyses_in_flight.get(cache_key)
+        if analysis is None:
+            analysis = analyses_in_flight[cache_key] = asyncio.create_task(analyze_pdf(content, cache_key))
+            analysis.add_done_callback(lambda _: analyses_in_flight.pop(cache_key, None))
+        else:
+            metrics.inc("resume_analyses_joined_total", help="Uploads that waited for the same PDF's running analysis")
+        # Shielded: the upload that started the analysis may go away, a waiting retry still needs it
+        result = await asyncio.shield(analysis)
+        if "error" in result:
+            return result
+        return await create_session(**result)
     except Exception as e:
         import traceback
         print(f"Error in analyze-resume: {e}")
         traceback.print_exc()
         return {"error": str(e)}
 
+async def analyze_pdf(content: bytes, cache_key: str) -> dict:
+    """
+    Parses, validates and analyzes a resume PDF. Returns the arguments for
+    create_session (and caches them), or an error response.
+    """
+    resume_text = await parser.parse(content)
+    
+    if not resume_text or len(resume_text.strip()) < 10:
+        return {"error": "Could not extract text from PDF. Please ensure the PDF contains readable text."}
+    
+    # Step 1: Validate if the document is actually a resume. The analysis call is
+    # the only one that sees the full resume; skill gaps and the digest later
+    # prompts use come out of its JSON
+    validation_prompt = prompts.validation_prompt(resume_text)
+    prompt = prompts.analysis_prompt(resume_text)
+    
+    if SPECULATIVE_RESUME_ANALYSIS:
+        # Start the analysis alongside validation; it is thrown away if the
+        # document turns out not to be a resume
+        analysis_task = asyncio.create_task(llm.generate(prompt))
+        try:
+            validation_result = (await llm.generate(validation_prompt)).strip().upper()
+            if not _is_resume(validation_result):
+                analysis_task.cancel()
+                return _not_resume(cache_key)
+            analysis = await analysis_task
+        except BaseException:
+            analysis_task.cancel()
+            raise
+    else:
+        validation_result = (await llm.generate(validation_prompt)).strip().upper()
+        if not _is_resume(validation_result):
+            return _not_resume(cache_key)
+        analysis = await llm.generate(prompt)
+    
+    # Parse interview topics, skill gaps and the resume digest from the analysis
+    analysis_json = parse_json(analysis)
+    if not isinstance(analysis_json, dict):
+        analysis_json = {}
+    interview_topics = analysis_json.get("interview_topics")
+    if not isinstance(interview_topics, list):
+        interview_topics = []
+    skill_gaps = prompts.skill_gaps_from_analysis(analysis_json)
+    if not skill_gaps:
+        # Analysis was not usable JSON - fall back to asking for the gaps directly
+        skill_gaps = await llm.generate(prompts.skill_gaps_prompt(resume_text))
+    
+    result = {
+        "resume_text": resume_text,
+        "analysis": analysis,
+        "skill_gaps": skill_gaps,
+        "interview_topics": interview_topics,
+        "resume_digest": prompts.resume_digest(resume_text, analysis_json)
+    }
+    analysis_cache.set(cache_key, result)
+    return result
+
+def get_minutes_per_topic(session_data: dict, duration: int) -> int:
+    interview_topics = session_data.get("interview_topics", [])
+    num_topics = len(interview_topics) if interview_topics else 5
+    return max(2, duration // num_topics)  # At least 2 minutes per topic
+
+def build_system_prompt(session_data: dict, persona: str, interview_type: str, difficulty: str, duration: int) -> tuple[str, dict]:
+    """
+    Builds the interviewer's system prompt from the resume digest, topics and interview settings.
+    """
+    interview_topics = session_data.get("interview_topics", [])
+    minutes_per_topic = get_minutes_per_topic(session_data, duration)
+    
+    digest = session_data.get("resume_digest") or prompts.resume_digest(session_data["resume_text"])
+    system_prompt = prompts.system_prompt(
+        persona, interview_type, difficulty, duration, digest, interview_topics, minutes_per_topic
+    )
+    return system_prompt, prompts.persona_traits(persona)
+
+def get_context(session_data: dict) -> ConversationContext:
+    return ConversationContext(session_data["context"], window_turns=CONTEXT_WINDOW_TURNS, fold_batch_turns=CONTEXT_FOLD_BATCH_TURNS)
+
+def schedule_fold(session_id: str, session_data: dict):
+    """
+    Starts a background summary of evicted turns if one is due and none is running.
+    """
+    task = session_data.get("fold_task")
+    if (task is None or task.done()) and get_context(session_data).needs_fold():
+        session_data["fold_task"] = asyncio.create_task(fold_context(session_id, session_data))
+
+async def fold_context(session_id: str, session_data: dict):
+    try:
+        await get_context(session_data).fold(llm)
+        await save_session(session_id, session_data)
+    except Exception as e:
+        print(f"Warning: context summary failed for {session_id}: {e}")
+
+def get_topic_tracker(session_data: dict) -> TopicTracker:
+    if "topic_tracker" not in session_data:
+        session_data["topic_tracker"] = TopicTracker.new_state(
+            session_data.get("interview_topics", []),
+            get_minutes_per_topic(session_data, session_data.get("duration", 15))
+        )
+    return TopicTracker(session_data["topic_tracker"], max_turns=TOPIC_MAX_TURNS)
+
+def schedule_prefetch(session_data: dict, audio_format: AudioFormat):
+    """
+    If the candidate's next answer will close the current topic, starts preparing
+    the opening question of the next one.
+    """
+    tracker = get_topic_tracker(session_data)
+    if not QUESTION_PREFETCH or tracker.next_topic is None or not tracker.topic_closing():
+        return
+    contents = get_context(session_data).build(
+        prompts.next_topic_prompt(tracker.current_topic, tracker.next_topic), tracker.prompt_state()
+    )
+    prefetcher.start(session_data, tracker.next_topic, contents, audio_format)
+
+async def serve_prepared(session_id: str, session_data: dict, channel: SessionChannel, message: str, prepared: dict, commit) -> str:
+    """
+    Answers with a prefetched question instead of calling the model, and records the exchange.
+    """
+    with metrics.span("reply", prefetched=True):
+        message_id = channel.begin_message()
+        await channel.send_json({"type": "text", "content": prepared["text"]}, message_id)
+        commit()
+        await channel.send_audio(prepared["audio"], message_id, AUDIO_CODECS[detect_codec(prepared["audio"])])
+    get_context(session_data).record(message, prepared["text"])
+    schedule_fold(session_id, session_data)
+    return prepared["text"]
+
+def get_report_builder(session_data: dict) -> ReportBuilder:
+    return ReportBuilder(session_data["report"], segment_turns=REPORT_SEGMENT_TURNS)
+
+def schedule_report_work(session_id: str, session_data: dict):
+    """
+    Assesses new transcript segments and scores new code submissions in the background.
+    """
+    builder = get_report_builder(session_data)
+    # Sessions loaded from a shared store come without runtime objects
+    tasks = session_data["report_tasks"] = session_data.get("report_tasks") or {}
+    conversation = session_data.get("conversation", [])
+    segment_task = tasks.get("segment")
+    if (segment_task is None or segment_task.done()) and builder.needs_assessment(conversation):
+        topics = [t.get("topic", "Unknown") for t in session_data.get("interview_topics", [])]
+        tasks["segment"] = asyncio.create_task(
+            run_report_work(session_id, session_data, builder.assess_segment(llm, conversation, topics))
+        )
+    code_submissions = session_data.get("code_submissions", [])
+    for i in builder.missing_code_reviews(code_submissions):
+        task = tasks.get(f"code_{i}")
+        if task is None or task.done():
+            tasks[f"code_{i}"] = asyncio.create_task(
+                run_report_work(session_id, session_data, builder.review_code(llm, i, code_submissions[i]))
+            )
+
+async def run_report_work(session_id: str, session_data: dict, work):
+    try:
+        await work
+        await save_session(session_id, session_data)
+    except Exception as e:
+        print(f"Warning: report assessment failed for {session_id}: {e}")
+
+AUDIO_CODECS = {"mp3": Codec.MP3, "opus": Codec.OPUS_WEBM}
+
+async def send_speech(channel: SessionChannel, text: str, audio_format: AudioFormat, message_id: int = None):
+    # Audio is best effort: the text has been sent already, so a TTS failure only skips this clip
+    try:
+        audio = await tts_service.generate_audio(text, audio_format)
+    except Exception as e:
+        print(f"Warning: speech synthesis failed, sending text only: {e}")
+        return
+    await channel.send_audio(audio, message_id, AUDIO_CODECS[detect_codec(audio)])
+
+async def reply_to(session_id: str, session_data: dict, channel: SessionChannel, message: str, stream: bool,
+                   audio_format: AudioFormat = NATIVE_FORMAT, commit=None) -> str:
+    """
+    Answers a candidate message using the bounded context and records the exchange.
+    commit() is called once the reply text has been sent in full.
+    """
+    committed = False
+
+    def commit_reply():
+        nonlocal committed
+        committed = True
+        if commit is not None:
+            commit()
+
+    context = get_context(session_data)
+    try:
+        with metrics.span("reply", stream=stream):
+            contents = context.build(message, get_topic_tracker(session_data).prompt_state())
+            ai_text = await send_reply(channel, contents, stream, audio_format, commit_reply)
+    except Exception as e:
+        if committed:
+            raise  # the client has the real reply; an apology now would contradict it
+        # A failed model call (quota, timeout) must not end the interview - apologize and carry on
+        print(f"Error generating reply for {session_id}: {e}")
+        commit_reply()
+        channel.begin_message()
+        await channel.send_json({"type": "text", "content": FALLBACK_REPLY})
+        await send_speech(channel, FALLBACK_REPLY, audio_format)
+        return FALLBACK_REPLY
+    context.record(message, ai_text)
+    schedule_fold(session_id, session_data)
+    return ai_text
+
+async def save_session(session_id: str, session_data: dict):
+    channel = session_data.get("channel")
+    if channel is not None:
+        session_data["seq"] = channel.seq  # lets another worker continue the numbering
+        session_data["message_id"] = channel.message_id
+    await session_store.save(session_id, session_data)
+
+async def send_reply(channel: SessionChannel, contents: list, stream: bool, audio_format: AudioFormat = NATIVE_FORMAT,
+                     commit=None) -> str:
+    """
+    Gets the interviewer's reply for the given contents and sends it to the client as text + audio.
+    """
+    commit = commit or (lambda: None)
+    message_id = channel.begin_message()
+    if not stream:
+        try:
+            ai_text = await llm.generate(contents, priority=Priority.INTERACTIVE)
+        except asyncio.CancelledError:
+            channel.cancel(message_id)
+            raise
+        await channel.send_json({"type": "text", "content": ai_text}, message_id)
+        commit()
+        if not channel.is_cancelled(message_id):
+            await send_speech(channel, ai_text, audio_format, message_id)
+        return ai_text
+
+    # Streaming mode: forward text deltas as they arrive and synthesize each finished
+    # sentence while the model is still writing the next one
+    sentences = asyncio.Queue()
+
+    async def speak():
+        while (sentence := await sentences.get()) is not None:
+            if channel.is_cancelled(message_id):
+                continue  # barged in - don't synthesize audio nobody will hear
+            await send_speech(channel, sentence, audio_format, message_id)
+
+    speaker = asyncio.create_task(speak())
+    deltas = llm.stream(contents, priority=Priority.INTERACTIVE)
+    try:
+        buffer = SentenceBuffer()
+        parts = []
+        async for delta in deltas:
+            parts.append(delta)
+            await channel.send_json({"type": "text_delta", "content": delta}, message_id)
+            for sentence in buffer.feed(delta):
+                sentences.put_nowait(sentence)
+        for sentence in buffer.flush():
+            sentences.put_nowait(sentence)
+        sentences.put_nowait(None)
+
+        # The final text message carries the whole reply, so older clients that
+        # ignore text_delta still see the complete response
+        ai_text = "".join(parts)
+        await channel.send_json({"type": "text", "content": ai_text}, message_id)
+        commit()
+        await speaker
+        return ai_text
+    except asyncio.CancelledError:
+        # Superseded by newer input: drop the partial reply on the client too
+        channel.cancel(message_id)
+        await channel.send_json({"type": "cancel"}, message_id)
+        raise
+    finally:
+        speaker.cancel()
+        await deltas.aclose()  # hands the scheduler slot back right away
+
+def turn_message(items: list[dict]) -> str:
+    """
+    Folds the candidate input gathered for one turn into a single model message.
+    """
+    spoken = " ".join(item["content"] for item in items if item["type"] == "transcript")
+    parts = [prompts.code_review_prompt(item["code"], item["language"]) for item in items if item["type"] == "code_submission"]
+    if not parts:
+        return spoken
+    if spoken:
+        parts.insert(0, f"The candidate said: {spoken}")
+    return "\n\n".join(parts)
+
+def turn_lines(items: list[dict]) -> list[str]:
+    spoken = " ".join(item["content"] for item in items if item["type"] == "transcript")
+    lines = [f"User: {spoken}"] if spoken else []
+    lines.extend(
+        f"User submitted code ({item['language']}):\n{item['code']}"
+        for item in items if item["type"] == "code_submission"
+    )
+    return lines
+
+async def handle_control_frame(channel: SessionChannel, outbox: SendQueue, data: bytes):
+    try:
+        frame = decode_frame(data)
+    except ValueError as e:
+        print(f"Ignoring malformed frame: {e}")
+        return
+    if frame.kind == Kind.PING:
+        await outbox.send_bytes(encode_frame(Kind.PONG, frame.message_id), audio=False)
+    elif frame.kind == Kind.CANCEL:
+        channel.cancel(frame.message_id)
+
 @app.websocket("/ws/interview/{session_id}")
 async def interview_endpoint(websocket: WebSocket, session_id: str):
-    await manager.connect(websocket)
+    await websocket.accept()
     
-    session_data = sessions.get(session_id)
+    session_data = await load_session(session_id)
     if not session_data:
         await websocket.close(code=4004, reason="Session not found")
         return
+    live_sessions[session_id] = session_data
+    current_session.set(session_id)  # tags every span recorded for this socket
+
+    # Waits in line (with position updates) if this worker is at capacity
+    outbox = await manager.connect(session_id, websocket)
+    if outbox is None:
+        return
+    try:
+        await run_interview(websocket, outbox, session_id, session_data)
+    finally:
+        manager.disconnect(session_id, outbox)
 
+async def run_interview(websocket: WebSocket, outbox: SendQueue, session_id: str, session_data: dict):
+    """
+    Runs an admitted interview socket: receives on websocket, sends through outbox.
+    """
     # Get interview settings from query params
     query_params = dict(websocket.query_params)
     persona = query_params.get("persona", "balanced")
     interview_type = query_params.get("type", "mixed")
     difficulty = query_params.get("difficulty", "mid")
     duration = int(query_params.get("duration", "15"))  # Duration in minutes
-    
-    # Store duration in session for report generation
-    session_data["duration"] = duration
-    session_data["code_submissions"] = []  # Track code submissions
-    
-    # Get interview topics and calculate time per topic
-    interview_topics = session_data.get("interview_topics", [])
-    num_topics = len(interview_topics) if interview_topics else 5
-    minutes_per_topic = max(2, duration // num_topics)  # At least 2 minutes per topic
-    
-    # Persona-specific behaviors
-    persona_traits = {
-        "friendly": {
-            "name": "Shreya",
-            "style": "warm, supportive, and encouraging. Give positive feedback frequently. Help candidates when they struggle.",
-            "greeting": "Hi there! I'm Shreya. Thanks so much for joining me today! I've had a chance to look at your resume - really impressive stuff! How are you feeling today?"
-        },
-        "balanced": {
-            "name": "Shreya", 
-            "style": "professional, fair, and constructive. Give balanced feedback. Ask follow-up questions to probe deeper.",
-            "greeting": "Hello! I'm Shreya. Thanks for joining me today. I've reviewed your resume, and it looks good. How are you doing today?"
-        },
-        "strict": {
-            "name": "Shreya",
-            "style": "rigorous, challenging, and demanding. Push candidates to think harder. Ask tough follow-up questions. Don't accept vague answers.",
-            "greeting": "Good day. I'm Shreya, and I'll be conducting your technical interview. I've reviewed your resume. Let's get started - we have limited time."
-        }
-    }
-    
-    traits = persona_traits.get(persona, persona_traits["balanced"])
-    
-    # Coding question instructions for longer interviews (>=10 minutes)
-    coding_instructions = ""
-    if duration >= 10 and interview_type in ["technical", "mixed"]:
-        coding_instructions = f"""
-    
-    CODING QUESTION REQUIREMENT:
-    Since this is a {duration}-minute interview, you MUST ask at least ONE coding problem.
-    - Ask a coding question appropriate for {difficulty} level (e.g., array manipulation, string processing, algorithm design)
-    - Clearly state the problem, input format, and expected output
-    - Tell the candidate to use the code editor on the right side of the screen to write their solution
-    - Tell them to click 'Submit Code' when they are done
-    - After they submit, you will receive their code and should provide feedback on it
-    - Evaluate: correctness, code quality, efficiency, and edge case handling
-    """
-    
-    # Build topics coverage instruction
-    topics_instruction = ""
-    if interview_topics:
-        topics_list = "\n".join([f"    - [{t.get('priority', 'medium').upper()}] {t.get('topic', 'Unknown')} ({t.get('category', 'general')})" for t in interview_topics])
-        topics_instruction = f"""
-    
-    TOPICS TO COVER (from candidate's resume):
-    You have {duration} minutes total. Aim to spend ~{minutes_per_topic} minutes per topic.
-{topics_list}
-    
-    TOPIC COVERAGE STRATEGY:
-    1. Start with HIGH priority topics first
-    2. Naturally transition between topics - don't abruptly switch
-    3. Ask 1-2 questions per topic before moving on
-    4. If the candidate demonstrates strong knowledge, briefly acknowledge and move to next topic
-    5. If they struggle, probe a bit deeper but don't get stuck - move on after 2-3 attempts
-    6. Ensure you cover at least the HIGH and MEDIUM priority topics
-    7. Keep track mentally of which topics you've covered
-    8. Near the end of the interview, if you haven't covered important topics, ask about them directly
-    """
-    
-    # Initialize Chat Session with Persona
-    system_prompt = f"""
-    You are '{traits["name"]}', a senior technical interviewer with the following style: {traits["style"]}
-    The candidate has the following background:
-    {session_data['resume_text']}
-    
-    Interview type: {interview_type} (technical = coding/system design, behavioral = STAR questions, mixed = both)
-    Difficulty level: {difficulty} (junior = basic concepts, mid = moderate complexity, senior = advanced topics, lead = architecture decisions)
-    
-    Your goal is to conduct a {difficulty}-level {interview_type} interview.
-    Keep your responses concise (1-3 sentences) to allow for conversation.
-    Wait for their answer before asking the next question.
-    Identify skill gaps based on their responses and resume.
-    {topics_instruction}
-    {coding_instructions}
-    """
-    
-    chat = model.start_chat(history=[
-        {"role": "user", "parts": [system_prompt]},
-        {"role": "model", "parts": [f"Understood. I am {traits['name']}. I am ready to interview the candidate."]}
-    ])
-    session_data["chat"] = chat
-
-    # Initial greeting from AI
-    greeting = traits["greeting"]
-    # Send text
-    await manager.send_personal_message(json.dumps({"type": "text", "content": greeting}), websocket)
-    # Send audio
-    audio_bytes = await tts_service.generate_audio(greeting)
-    await websocket.send_bytes(audio_bytes) 
+    stream = query_params.get("stream", str(STREAM_RESPONSES)).lower() == "true"
+    # Clients that understand framed binary messages ask for them; everyone else gets the original format
+    protocol = PROTOCOL_VERSION if query_params.get("protocol") == str(PROTOCOL_VERSION) else LEGACY_PROTOCOL
+    # Audio format for this connection, e.g. ?audio=opus&bitrate=24&sample_rate=16000 on weak links
+    audio_format = tts_service.negotiate_format(
+        query_params.get("audio", TTS_AUDIO_FORMAT),
+        int(query_params.get("bitrate", "0")) or None,
+        int(query_params.get("sample_rate", "0")) or None
+    )
+    
+    # Reconnects carry the token from the "session" message and the last seq they saw
+    resume_token = query_params.get("resume_token")
+    last_seq = int(query_params.get("last_seq", "0"))
+    resuming = (
+        bool(resume_token)
+        and resume_token == session_data.get("resume_token")
+        and bool(session_data.get("context"))
+    )
+    
+    if resuming:
+        # Reattach to the running interview: no new context, no greeting, only what was missed
+        channel = session_data.get("channel")
+        if channel is None:
+            # First time this worker sees the session - nothing to replay, keep numbering
+            channel = session_data["channel"] = SessionChannel(
+                start_seq=session_data.get("seq", 0),
+                start_message_id=session_data.get("message_id", 0)
+            )
+        channel.attach(outbox, protocol)
+        await manager.send_personal_message(json.dumps({"type": "session", "resume_token": resume_token, "resumed": True, "protocol": protocol, "audio": audio_format._asdict()}), outbox)
+        replayed = await channel.replay(last_seq)
+        print(f"Client #{session_id} resumed, replayed {replayed} message(s)")
+    else:
+        # Store duration in session for report generation
+        session_data["duration"] = duration
+        session_data["code_submissions"] = []  # Track code submissions
+        session_data["report"] = ReportBuilder.new_state()  # Report notes built up during the interview
+        session_data["topic_tracker"] = TopicTracker.new_state(
+            session_data.get("interview_topics", []), get_minutes_per_topic(session_data, duration)
+        )
+        
+        system_prompt, traits = build_system_prompt(session_data, persona, interview_type, difficulty, duration)
+        session_data["context"] = ConversationContext.new_state(
+            system_prompt,
+            f"Understood. I am {traits['name']}. I am ready to interview the candidate."
+        )
+        
+        session_data["resume_token"] = secrets.token_urlsafe(16)
+        channel = session_data["channel"] = SessionChannel()
+        channel.attach(outbox, protocol)
+        await manager.send_personal_message(json.dumps({"type": "session", "resume_token": session_data["resume_token"], "resumed": False, "protocol": protocol, "audio": audio_format._asdict()}), outbox)
+
+        # Initial greeting from AI
+        greeting = traits["greeting"]
+        channel.begin_message()
+        # Send text
+        await channel.send_json({"type": "text", "content": greeting})
+        # Send audio
+        await send_speech(channel, greeting, audio_format)
+        await save_session(session_id, session_data)
+
+    async def respond(items: list[dict], commit):
+        message = turn_message(items)
+        tracker = get_topic_tracker(session_data)
+        prepared = None
+        if any(item["type"] == "code_submission" for item in items):
+            prefetcher.discard(session_data)  # code needs a review, not the next topic's question
+        elif QUESTION_PREFETCH and tracker.next_topic is not None and tracker.topic_closing():
+            # This answer wraps up the topic - the next topic's question may already be waiting
+            prepared = prefetcher.take(session_data, tracker.next_topic)
+        if prepared:
+            ai_text = await serve_prepared(session_id, session_data, channel, message, prepared, commit)
+        else:
+            ai_text = await reply_to(session_id, session_data, channel, message, stream, audio_format, commit)
+        tracker.record_answer()
+        tracker.record_exchange(message, ai_text)
+        session_data["topics_covered"] = tracker.covered
+        # Store the exchange for report generation
+        session_data.setdefault("conversation", []).extend(turn_lines(items))
+        session_data["conversation"].append(f"AI: {ai_text}")
+        schedule_report_work(session_id, session_data)
+        schedule_prefetch(session_data, audio_format)
+        await save_session(session_id, session_data)
+
+    # Replies are generated in their own task so this loop keeps reading the socket
+    turns = session_data["turns"] = TurnQueue(respond, coalesce_seconds=TURN_COALESCE_MS / 1000)
+    turns.start()
 
     try:
         while True:
-            data = await websocket.receive_text()
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            if received.get("bytes") is not None:
+                # Protocol 2 control frames: pings and barge-in cancellation
+                await handle_control_frame(channel, outbox, received["bytes"])
+                continue
+
+            data = received["text"]
+            # Handle ping messages to keep connection alive (without parsing them)
+            if data == LEGACY_PING:
+                await manager.send_personal_message(json.dumps({"type": "pong"}), outbox, kind="pong")
+                continue
+
             # client sends JSON: { "type": "transcript", "content": "..." }
             message_data = json.loads(data)
             
-            # Handle ping messages to keep connection alive
             if message_data.get("type") == "ping":
-                await manager.send_personal_message(json.dumps({"type": "pong"}), websocket)
+                await manager.send_personal_message(json.dumps({"type": "pong"}), outbox, kind="pong")
                 continue
-            
+
+            if message_data.get("type") == "cancel":
+                channel.cancel(int(message_data.get("id", channel.message_id)))
+                continue
+
+            if message_data.get("type") not in ("transcript", "code_submission"):
+                continue
+
             # Handle code submissions
             if message_data.get("type") == "code_submission":
-                code = message_data.get("code", "")
-                language = message_data.get("language", "unknown")
-                
+                item = {
+                    "type": "code_submission",
+                    "code": message_data.get("code", ""),
+                    "language": message_data.get("language", "unknown")
+                }
                 # Store the code submission
-                session_data["code_submissions"].append({
-                    "code": code,
-                    "language": language
-                })
-                
-                # Send code to AI for evaluation
-                code_prompt = f"""The candidate has submitted their code solution:
-
-Language: {language}
-```{language}
-{code}
-```
-
-Please review this code and provide brief feedback on:
-1. Does it look correct for the problem asked?
-2. Code quality and readability
-3. Any suggestions for improvement
-
-Keep your response concise (2-4 sentences)."""
-                
-                # Store in conversation
-                if "conversation" not in session_data:
-                    session_data["conversation"] = []
-                session_data["conversation"].append(f"User submitted code ({language}):\n{code}")
-                
-                # Get AI response
-                response = chat.send_message(code_prompt)
-                ai_text = response.text
-                
-                # Store AI response
-                session_data["conversation"].append(f"AI: {ai_text}")
-                
-                # Send Text
-                await manager.send_personal_message(json.dumps({"type": "text", "content": ai_text}), websocket)
-                
-                # Generate and Send Audio
-                audio_data = await tts_service.generate_audio(ai_text)
-                await websocket.send_bytes(audio_data)
-                continue
-            
-            if message_data.get("type") == "transcript":
-                user_text = message_data["content"]
-                
-                # Store conversation in session for report generation
-                if "conversation" not in session_data:
-                    session_data["conversation"] = []
-                session_data["conversation"].append(f"User: {user_text}")
-                
-                # Get AI response
-                response = chat.send_message(user_text)
-                ai_text = response.text
-                
-                # Store AI response
-                session_data["conversation"].append(f"AI: {ai_text}")
-                
-                # Send Text
-                await manager.send_personal_message(json.dumps({"type": "text", "content": ai_text}), websocket)
-                
-                # Generate and Send Audio
-                audio_data = await tts_service.generate_audio(ai_text)
-                await websocket.send_bytes(audio_data)
+                session_data["code_submissions"].append({"code": item["code"], "language": item["language"]})
+            else:
+                item = {"type": "transcript", "content": message_data["content"]}
+
+            if turns.busy:
+                # The candidate is talking over the interviewer - stop the audio
+                channel.cancel(channel.message_id)
+            turns.put(item)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        channel.detach(outbox)
         print(f"Client #{session_id} left")
     except Exception as e:
         print(f"Error: {e}")
-        manager.disconnect(websocket)
+        channel.detach(outbox)
+    finally:
+        turns.close()
 
 @app.post("/end-interview/{session_id}")
-async def end_interview(session_id: str):
-    session_data = sessions.get(session_id)
-    if not session_data or not session_data.get("chat"):
+async def end_interview(session_id: str, stream: bool = False):
+    session_data = await load_session(session_id)
+    if not session_data or not session_data.get("context"):
         return {"error": "Session not found or chat not initialized"}
+    current_session.set(session_id)
     
-    chat = session_data["chat"]
     skill_gaps = session_data.get("skill_gaps", "No skill gap data available")
     code_submissions = session_data.get("code_submissions", [])
-    
-    # Get the actual conversation that happened
-    conversation_history = session_data.get("conversation", [])
-    conversation_text = "\n".join(conversation_history) if conversation_history else "No conversation recorded"
-    
-    # Get interview duration and topics covered
+    conversation = session_data.get("conversation", [])
     duration = session_data.get("duration", 15)
     interview_topics = session_data.get("interview_topics", [])
-    
-    # Build coding assessment section if code was submitted
-    coding_section = ""
-    if code_submissions:
-        coding_section = """
-    ### Coding Assessment
-    The candidate submitted code during the interview. Evaluate ONLY the submitted code:
-    - Code Correctness: [1-10]/10 (Does the code solve the problem asked?)
-    - Code Quality: [1-10]/10 (Readability, naming, structure)
-    - Efficiency: [1-10]/10 (Time/space complexity considerations)
-    - Edge Cases: [1-10]/10 (Did they handle edge cases?)
-    - Overall Coding Score: [1-10]/10
-    (Provide specific feedback on their actual submitted code)
-    """
-        # Append code submissions to prompt for context
-        for i, submission in enumerate(code_submissions, 1):
-            coding_section += f"\n    Code Submission {i} ({submission['language']}):\n    ```{submission['language']}\n    {submission['code']}\n    ```\n"
-    
-    # Build topics list from resume for comparison
-    topics_from_resume = ""
-    if interview_topics:
-        topics_list = "\n".join([f"    - {t.get('topic', 'Unknown')} ({t.get('priority', 'medium')} priority)" for t in interview_topics])
-        topics_from_resume = f"""
-    ============ TOPICS FROM RESUME (Expected to be covered) ============
-{topics_list}
-    ======================================================================
-    """
-    
-    # Generate Report using Gemini with explicit conversation context
-    prompt = f"""
-    The interview is complete. Generate a Report Card based STRICTLY on the actual conversation below.
-    
-    ============ ACTUAL INTERVIEW TRANSCRIPT ============
-    {conversation_text}
-    =====================================================
-    {topics_from_resume}
-    Interview Duration: {duration} minutes
-    
-    ⚠️ CRITICAL INSTRUCTIONS - READ CAREFULLY:
-    1. ONLY evaluate topics and skills that were ACTUALLY DISCUSSED in the transcript above
-    2. DO NOT mention or score ANY topic that was not explicitly covered in the conversation
-    3. DO NOT assume knowledge or skills - only assess what the candidate actually demonstrated
-    4. If a topic wasn't discussed, DO NOT include it in strengths, weaknesses, or recommendations
-    5. Quote specific responses from the transcript to justify your scores
-    6. If the interview was short or limited in scope, reflect that honestly in your assessment
-    7. Compare the "Topics from Resume" list with the actual transcript to identify what was NOT covered
-    
-    SCORING GUIDELINES (be honest and specific):
-    - 1-3: Poor (wrong answers, fundamental misunderstandings, couldn't answer)
-    - 4-5: Below Average (partial knowledge, struggled to explain, major gaps)
-    - 6-7: Average (correct but basic answers, could go deeper)
-    - 8-9: Good (strong understanding, clear explanations, good examples)
-    - 10: Excellent (exceptional depth, went above and beyond)
-    
-    ## INTERVIEW REPORT CARD
-    
-    ### Overall Score: [X.X]/10
-    (Justify based on SPECIFIC responses from the transcript)
-    
-    ### Topics Actually Covered
-    List ONLY the topics that were discussed with brief assessment:
-    - [Topic 1]: [Brief assessment based on actual response]
-    - [Topic 2]: [Brief assessment based on actual response]
-    (Only include topics from the actual conversation)
-    
-    ### Technical Assessment
-    - Demonstrated Proficiency: (Junior/Mid/Senior - based ONLY on actual answers)
-    - Strengths Shown: (2-3 specific examples with quotes from transcript)
-    - Weaknesses Identified: (2-3 specific gaps shown in actual responses)
-    {coding_section}
-    
-    ### Communication Quality
-    - Clarity: [1-10]/10 (How clearly did they explain in their actual responses?)
-    - Depth of Answers: [1-10]/10 (Did they provide detailed or superficial answers?)
-    - Technical Vocabulary: [1-10]/10 (Did they use correct terminology?)
-    
-    ### Key Quotes from Interview
-    Include 2-3 notable quotes (good or bad) from the candidate's actual responses.
-    
-    ### Recommendations for Improvement
-    (Base these ONLY on weaknesses actually observed in the interview)
-    1. [Specific recommendation based on actual gap shown]
-    2. [Specific recommendation based on actual gap shown]
-    
-    ### Topics NOT Covered (From Resume)
-    Compare the "Topics from Resume" list above with what was actually discussed.
-    List any resume topics that were NOT discussed during the interview as "Not Assessed":
-    - [Topic from resume]: Not Assessed
-    (This helps identify gaps in the interview coverage - do NOT score these)
-    
-    Format as clean markdown. Be HONEST and BASE EVERYTHING on the actual transcript above.
-    """
-    
-    response = chat.send_message(prompt)
-    report = response.text
-    
+    builder = get_report_builder(session_data)
+    prefetcher.discard(session_data)
+    
+    # Let background assessments finish, then cover whatever they have not reached yet
+    # (the last few exchanges, reviews lost to a failure or another worker)
+    running = [task for task in (session_data.get("report_tasks") or {}).values() if not task.done()]
+    await asyncio.gather(*running, return_exceptions=True)
+    topics = [t.get("topic", "Unknown") for t in interview_topics]
+    # The candidate is waiting now, so this work no longer runs at background priority
+    remaining = [
+        builder.review_code(llm, i, code_submissions[i], priority=Priority.ANALYSIS)
+        for i in builder.missing_code_reviews(code_submissions)
+    ]
+    remaining.append(builder.assess_segment(llm, conversation, topics, priority=Priority.ANALYSIS))
+    for result in await asyncio.gather(*remaining, return_exceptions=True):
+        if isinstance(result, Exception):
+            print(f"Warning: report assessment failed for {session_id}: {result}")
+    
+    # Topic coverage was tracked turn by turn, so the report never re-scans the transcript for it
+    coverage = get_topic_tracker(session_data).coverage()
+    prompt = builder.summary_prompt(session_data["context"]["summary"], duration, coverage)
+    precomputed = builder.precomputed_sections(coverage)
+    
+    async def generate_report():
+        parts = []
+        try:
+            try:
+                async for delta in llm.stream(prompt, priority=Priority.ANALYSIS):
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                print(f"Warning: report summary failed for {session_id}: {e}")
+                note = ("\n\n" if parts else "## INTERVIEW REPORT CARD\n\n") + SUMMARY_UNAVAILABLE
+                parts.append(note)
+                yield note
+            parts.append(precomputed)
+            yield precomputed
+            # Keep the session around briefly (report retries), then let the reaper drop it
+            session_data["ended_at"] = time.time()
+            await save_session(session_id, session_data)
+        finally:
+            # The interview is archived even if the client left mid-report or the model failed
+            if persistence:
+                persistence.enqueue(build_record(session_id, session_data, "".join(parts)))
+    
+    if stream:
+        # Markdown is sent as it is written, so the candidate sees the report build up
+        return StreamingResponse(generate_report(), media_type="text/markdown")
+    
+    report = "".join([chunk async for chunk in generate_report()])
     return {"report": report, "skill_gaps": skill_gaps}
 
 if __name__ == "__main__":
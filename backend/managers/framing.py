@@ -0,0 +1,47 @@
+# Binary framing for the interview WebSocket (protocol version 2)
+import struct
+from enum import IntEnum
+from typing import NamedTuple
+
+PROTOCOL_VERSION = 2
+LEGACY_PROTOCOL = 1
+
+# version, kind, codec, flags, message id, seq - 12 bytes, network byte order
+HEADER = struct.Struct("!BBBBII")
+
+# What the original client sends every 25s; compared as a string so pings skip json.loads
+LEGACY_PING = '{"type":"ping"}'
+
+class Kind(IntEnum):
+    AUDIO = 1  # server -> client, payload is encoded audio for message_id
+    PING = 2  # client -> server, message_id is an opaque nonce
+    PONG = 3  # server -> client, echoes the ping's nonce
+    CANCEL = 4  # client -> server, stop sending audio for message_id and everything before it
+
+class Codec(IntEnum):
+    NONE = 0
+    MP3 = 1
+    OPUS_WEBM = 2
+
+class Frame(NamedTuple):
+    kind: Kind
+    codec: Codec
+    flags: int
+    message_id: int
+    seq: int
+    payload: bytes
+
+def encode_frame(kind: Kind, message_id: int = 0, seq: int = 0, payload: bytes = b"",
+                 codec: Codec = Codec.NONE, flags: int = 0) -> bytes:
+    return HEADER.pack(PROTOCOL_VERSION, kind, codec, flags, message_id, seq) + payload
+
+def decode_frame(data: bytes) -> Frame:
+    """
+    Parses a version 2 binary frame. Raises ValueError for anything else.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Frame is shorter than its header")
+    version, kind, codec, flags, message_id, seq = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version {version}")
+    return Frame(Kind(kind), Codec(codec), flags, message_id, seq, data[HEADER.size:])
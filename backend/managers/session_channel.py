@@ -0,0 +1,119 @@
+# Per-session outbound channel that survives WebSocket reconnects
+import json
+from collections import deque
+from managers.framing import LEGACY_PROTOCOL, PROTOCOL_VERSION, Codec, Kind, encode_frame
+from managers.socket_manager import SendQueue
+from services.metrics import metrics
+
+class SessionChannel:
+    """
+    Numbers every message sent to the client and keeps the most recent ones in a
+    bounded replay buffer. When the client reconnects with the last sequence number
+    it saw, only the messages it missed are sent again.
+
+    Every interviewer reply gets a message id. JSON messages carry their "seq" and
+    "id". On protocol 2 audio is sent as a framed binary message (see
+    managers/framing.py) with its own seq, id and codec; on the legacy protocol it
+    is sent raw and numbered implicitly (the client counts binary frames).
+    Frames are encoded at delivery, so a reconnect may switch protocols.
+
+    Messages go out through the socket's SendQueue, which may shed some of them
+    (deltas, stale audio) for a slow client; the replay buffer keeps them all.
+    """
+    def __init__(self, start_seq: int = 0, start_message_id: int = 0, max_messages: int = 64,
+                 max_bytes: int = 2 * 1024 * 1024):
+        self.seq = start_seq
+        self.message_id = start_message_id
+        self.cancelled_through = 0  # audio for this message id and older is dropped
+        self.websocket = None
+        self.protocol = LEGACY_PROTOCOL
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._buffer = deque()  # (seq, payload, message_id, codec, kind); payload is str (JSON) or bytes (audio)
+        self._buffer_bytes = 0
+
+    def attach(self, websocket: SendQueue, protocol: int = LEGACY_PROTOCOL):
+        self.websocket = websocket
+        self.protocol = protocol
+
+    def detach(self, websocket: SendQueue):
+        # A stale handler must not detach the socket that replaced it
+        if self.websocket is websocket:
+            self.websocket = None
+
+    def begin_message(self) -> int:
+        self.message_id += 1
+        return self.message_id
+
+    def cancel(self, message_id: int) -> bool:
+        """
+        Barge-in: the client no longer wants audio for message_id (or anything older).
+        Returns False if there was nothing newer to cancel.
+        """
+        message_id = min(message_id, self.message_id)
+        if message_id <= self.cancelled_through:
+            return False
+        self.cancelled_through = message_id
+        # Audio for cancelled messages must not come back on a replay either
+        self._buffer = deque(
+            entry for entry in self._buffer
+            if not (isinstance(entry[1], bytes) and entry[2] <= message_id)
+        )
+        self._buffer_bytes = sum(len(entry[1]) for entry in self._buffer)
+        return True
+
+    def is_cancelled(self, message_id: int) -> bool:
+        return message_id <= self.cancelled_through
+
+    async def send_json(self, message: dict, message_id: int = None):
+        message_id = message_id or self.message_id
+        self.seq += 1
+        payload = json.dumps({**message, "seq": self.seq, "id": message_id})
+        # Tells the send queue which messages it may merge when the client falls behind
+        kind = "delta" if message.get("type") == "text_delta" else "json"
+        self._remember(payload, message_id, Codec.NONE, kind)
+        await self._deliver(self.seq, payload, message_id, Codec.NONE, kind)
+
+    async def send_audio(self, audio: bytes, message_id: int = None, codec: Codec = Codec.MP3):
+        message_id = message_id or self.message_id
+        if self.is_cancelled(message_id):
+            return  # the candidate talked over this reply
+        self.seq += 1
+        self._remember(audio, message_id, codec, "audio")
+        await self._deliver(self.seq, audio, message_id, codec, "audio")
+
+    async def replay(self, last_seq: int) -> int:
+        """
+        Resends buffered messages newer than last_seq and returns how many were sent.
+        """
+        missed = [entry for entry in self._buffer if entry[0] > last_seq]
+        for entry in missed:
+            await self._deliver(*entry)
+        return len(missed)
+
+    def _remember(self, payload, message_id: int, codec: Codec, kind: str):
+        self._buffer.append((self.seq, payload, message_id, codec, kind))
+        self._buffer_bytes += len(payload)
+        while len(self._buffer) > self.max_messages or self._buffer_bytes > self.max_bytes:
+            dropped = self._buffer.popleft()
+            self._buffer_bytes -= len(dropped[1])
+
+    async def _deliver(self, seq: int, payload, message_id: int, codec: Codec, kind: str):
+        websocket = self.websocket
+        if websocket is None:
+            return  # Client is away; the message waits in the replay buffer
+        try:
+            if isinstance(payload, bytes):
+                audio_bytes = len(payload)
+                if self.protocol >= PROTOCOL_VERSION:
+                    payload = encode_frame(Kind.AUDIO, message_id, seq, payload, codec)
+                await websocket.send_bytes(payload, message_id)
+                # Counted here, not at synthesis: prewarmed, discarded and cancelled clips never reach a client
+                metrics.inc("tts_audio_sent_bytes_total", audio_bytes, help="Audio bytes sent to clients, by codec",
+                            codec=codec.name.lower())
+            else:
+                await websocket.send_text(payload, message_id, kind)
+        except Exception:
+            # The socket died mid-turn. Let the turn finish so its reply is stored,
+            # and deliver it from the buffer when the client comes back.
+            self.detach(websocket)
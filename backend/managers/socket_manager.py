@@ -1,16 +1,250 @@
 # WebSocket Connection Manager
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
 from fastapi import WebSocket
+from services.metrics import metrics
+
+# Close code for "try again later" (server full, or a client too slow to keep up)
+TRY_AGAIN_LATER = 1013
+
+class SendQueue:
+    """
+    Outbound messages for one WebSocket, written by a background task so a slow
+    client never holds up the reply that produces them. Has the send_text /
+    send_bytes interface of a WebSocket, so it can stand in for one.
+
+    The queue is bounded. When the client falls behind and the queue goes over
+    max_messages or max_bytes, it sheds what the client can do without:
+      - queued text_delta messages of a reply are merged into one
+      - audio of a reply is dropped once a newer reply is queued
+      - only the newest pong is kept
+    Complete texts, session and cancel messages are never dropped. If the queue is
+    still over twice its bounds after that, the client cannot keep up at all: the
+    socket is closed with 1013 and the client resumes from the replay buffer.
+    """
+    def __init__(self, websocket: WebSocket, max_messages: int = 64, max_bytes: int = 1024 * 1024):
+        self.websocket = websocket
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.closed = False
+        self._queue = deque()  # [payload, message_id, kind]; kind is "json", "delta", "pong" or "audio"
+        self._bytes = 0
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._run())
+        self._closer = None
+
+    async def send_text(self, payload: str, message_id: int = 0, kind: str = "json"):
+        """
+        kind is "delta" for a text_delta and "pong" for a pong, which may be shed; any other message is "json".
+        """
+        self._put(payload, message_id, kind)
+
+    async def send_bytes(self, payload: bytes, message_id: int = 0, audio: bool = True):
+        self._put(payload, message_id, "audio" if audio else "pong")
+
+    def close(self):
+        self.closed = True
+        self._writer.cancel()
+        self._queue.clear()
+        self._bytes = 0
+
+    def _put(self, payload, message_id: int, kind: str):
+        if self.closed:
+            raise ConnectionError("WebSocket is closed")
+        self._queue.append([payload, message_id, kind])
+        self._bytes += len(payload)
+        if len(self._queue) > self.max_messages or self._bytes > self.max_bytes:
+            self._shed()
+            if len(self._queue) > 2 * self.max_messages or self._bytes > 2 * self.max_bytes:
+                metrics.inc("ws_slow_client_closes_total", help="Sockets closed because the client fell too far behind")
+                self.close()
+                # Held on the queue: the event loop only keeps a weak reference to running tasks
+                self._closer = asyncio.create_task(self._close_socket())
+                raise ConnectionError("Client fell too far behind")
+        self._ready.set()
+
+    def _shed(self):
+        newest_id = max(entry[1] for entry in self._queue)
+        last_pong = max((i for i, entry in enumerate(self._queue) if entry[2] == "pong"), default=None)
+        shed = set()  # indexes of entries to drop
+        dropped = coalesced = 0
+        deltas = {}  # message id -> indexes of its queued deltas
+        for i, entry in enumerate(self._queue):
+            if (entry[2] == "audio" and entry[1] < newest_id) or (entry[2] == "pong" and i != last_pong):
+                shed.add(i)
+                dropped += 1
+            elif entry[2] == "delta":
+                deltas.setdefault(entry[1], []).append(i)
+        for indexes in deltas.values():
+            if len(indexes) < 2:
+                continue
+            # The last delta carries all the text (and the highest seq), in its place in the queue
+            messages = [json.loads(self._queue[i][0]) for i in indexes]
+            messages[-1]["content"] = "".join(message.get("content", "") for message in messages)
+            self._queue[indexes[-1]][0] = json.dumps(messages[-1])
+            shed.update(indexes[:-1])
+            coalesced += len(indexes) - 1
+        self._queue = deque(entry for i, entry in enumerate(self._queue) if i not in shed)
+        self._bytes = sum(len(entry[0]) for entry in self._queue)
+        if dropped:
+            metrics.inc("ws_send_shed_total", dropped, help="Outbound messages shed for slow clients", action="dropped")
+        if coalesced:
+            metrics.inc("ws_send_shed_total", coalesced, help="Outbound messages shed for slow clients", action="coalesced")
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=TRY_AGAIN_LATER, reason="Client too slow")
+        except Exception:
+            pass  # already gone
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._queue:
+                payload, _, kind = self._queue.popleft()
+                self._bytes -= len(payload)
+                try:
+                    if isinstance(payload, bytes):
+                        with metrics.span("ws_send", kind=kind, bytes=len(payload)):
+                            await self.websocket.send_bytes(payload)
+                    else:
+                        with metrics.span("ws_send", kind="json"):
+                            await self.websocket.send_text(payload)
+                except Exception:
+                    # The socket died; the next send raises so the sender can detach
+                    self.closed = True
+                    self._queue.clear()
+                    return
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    """
+    Admission control for interview sockets on this worker.
+
+    At most max_active interviews are served at once, so an overloaded worker
+    keeps its running interviews responsive instead of degrading all of them.
+    Up to max_waiting more connections wait in line and are told their position
+    and estimated wait every update_seconds; beyond that a connection is turned
+    away with 1013. The estimate assumes slots free up at the observed average
+    connection length.
+
+    Sockets are registered by session id, so a reconnect takes over its session's
+    slot instead of queueing again.
+    """
+    def __init__(self, max_active: int = 100, max_waiting: int = 50, update_seconds: float = 5.0,
+                 expected_session_seconds: float = 15 * 60, send_queue_messages: int = 64,
+                 send_queue_bytes: int = 1024 * 1024):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.update_seconds = update_seconds
+        self.send_queue_messages = send_queue_messages
+        self.send_queue_bytes = send_queue_bytes
+        self.active: dict[str, SendQueue] = {}  # session id -> its socket's send queue (None while handed over)
+        self.waiting: OrderedDict[str, asyncio.Future] = OrderedDict()  # session id -> slot, first come first served
+        self.avg_session_seconds = expected_session_seconds
+        self._connected_at: dict[str, float] = {}
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def connect(self, session_id: str, websocket: WebSocket):
+        """
+        Admits an accepted socket, waiting in line if the worker is full. Returns the
+        SendQueue to send through, or None if the socket was turned away or left
+        while waiting.
+        """
+        if session_id not in self.active and len(self.active) >= self.max_active:
+            if not await self._wait_for_slot(session_id, websocket):
+                return None
+        return self._register(session_id, websocket)
+
+    def disconnect(self, session_id: str, outbox: SendQueue):
+        outbox.close()
+        # A stale handler must not release the slot of the socket that replaced it
+        if self.active.get(session_id) is not outbox:
+            return
+        del self.active[session_id]
+        connected_at = self._connected_at.pop(session_id, None)
+        if connected_at is not None:
+            self.avg_session_seconds += 0.2 * (time.time() - connected_at - self.avg_session_seconds)
+        self._admit_next()
+
+    async def send_personal_message(self, message: str, outbox: SendQueue, kind: str = "json"):
+        await outbox.send_text(message, kind=kind)
+
+    def estimated_wait(self, position: int) -> float:
+        return position * self.avg_session_seconds / max(1, self.max_active)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self.active),
+            "waiting": len(self.waiting),
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "avg_session_seconds": round(self.avg_session_seconds, 1),
+        }
+
+    def _register(self, session_id: str, websocket: WebSocket) -> SendQueue:
+        previous = self.active.get(session_id)
+        if previous is not None:
+            previous.close()  # the old socket of a reconnecting client
+        outbox = self.active[session_id] = SendQueue(websocket, self.send_queue_messages, self.send_queue_bytes)
+        self._connected_at.setdefault(session_id, time.time())
+        self.admitted += 1
+        metrics.inc("ws_admissions_total", help="Interview sockets by admission outcome", result="admitted")
+        return outbox
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    def _admit_next(self):
+        while self.waiting and len(self.active) < self.max_active:
+            session_id, slot = self.waiting.popitem(last=False)
+            if not slot.done():
+                self.active[session_id] = None  # reserved until the waiter registers
+                slot.set_result(True)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    async def _wait_for_slot(self, session_id: str, websocket: WebSocket) -> bool:
+        previous = self.waiting.pop(session_id, None)
+        if previous is not None and not previous.done():
+            previous.set_result(False)  # an older socket of the same session gives up its place
+        if len(self.waiting) >= self.max_waiting:
+            self.rejected += 1
+            metrics.inc("ws_admissions_total", help="Interview sockets by admission outcome", result="rejected")
+            retry_after = round(self.estimated_wait(len(self.waiting) + 1))
+            try:
+                await websocket.send_text(json.dumps({"type": "busy", "retry_after_seconds": retry_after}))
+                await websocket.close(code=TRY_AGAIN_LATER, reason="Server busy")
+            except Exception:
+                pass
+            return False
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        self.queued += 1
+        metrics.inc("ws_admissions_total", help="Interview sockets by admission outcome", result="queued")
+        slot = asyncio.get_running_loop().create_future()
+        self.waiting[session_id] = slot
+        admitted = False
+        try:
+            while True:
+                position = list(self.waiting).index(session_id) + 1
+                await websocket.send_text(json.dumps({
+                    "type": "queued",
+                    "position": position,
+                    "estimated_wait_seconds": round(self.estimated_wait(position))
+                }))
+                try:
+                    admitted = await asyncio.wait_for(asyncio.shield(slot), timeout=self.update_seconds)
+                    return admitted
+                except asyncio.TimeoutError:
+                    continue
+        except Exception:
+            return False  # the client left while waiting
+        finally:
+            if self.waiting.get(session_id) is slot:
+                del self.waiting[session_id]
+            if not admitted and slot.done() and slot.result() and self.active.get(session_id, False) is None:
+                # Handed a slot just as it left: pass the slot on
+                del self.active[session_id]
+                self._admit_next()
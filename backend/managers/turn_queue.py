@@ -0,0 +1,90 @@
+# Per-session queue between the WebSocket receive loop and reply generation
+import asyncio
+from services.metrics import metrics
+
+class TurnQueue:
+    """
+    Collects candidate input and answers it one interviewer turn at a time, in its
+    own task, so the socket keeps being read (pings, barge-in) while a reply is
+    being generated.
+
+    Fragments that arrive within coalesce_seconds of each other become one turn.
+    Input that arrives while a reply is still being written supersedes it: the
+    reply is cancelled and its input is answered together with the new input.
+    Once a reply has committed (its full text was sent), later input waits for
+    the next turn instead.
+
+    respond(items, commit) answers a list of input dicts and must call commit()
+    as soon as the reply can no longer be taken back.
+    """
+    def __init__(self, respond, coalesce_seconds: float = 0.3):
+        self.respond = respond
+        self.coalesce_seconds = coalesce_seconds
+        self.pending = []  # input not answered yet, oldest first
+        self.closed = False
+        self._reply = None
+        self._committed = False
+        self._wakeup = asyncio.Event()
+        self._runner = None
+
+    @property
+    def busy(self) -> bool:
+        return self._reply is not None and not self._reply.done()
+
+    def start(self):
+        self._runner = asyncio.create_task(self._run())
+
+    def put(self, item: dict):
+        self.pending.append(item)
+        metrics.inc("interview_turn_inputs_total", help="Candidate messages received (before coalescing)")
+        if self.busy and not self._committed:
+            self._reply.cancel()
+        self._wakeup.set()
+
+    def close(self):
+        """
+        The socket is gone. Input already received is still answered (the reply
+        waits in the replay buffer), then the runner exits.
+        """
+        self.closed = True
+        self._wakeup.set()
+
+    def _commit(self):
+        self._committed = True
+
+    async def _run(self):
+        while True:
+            # Once closed there is nothing more to wait for: close() may have set the
+            # wakeup during the coalescing wait below, which cleared it again
+            if not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+            if not self.pending:
+                if self.closed:
+                    return
+                continue
+            # Give the candidate a moment to finish the thought before calling the model
+            while not self.closed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.coalesce_seconds)
+                    self._wakeup.clear()
+                except asyncio.TimeoutError:
+                    break
+
+            items, self.pending = self.pending, []
+            self._committed = False
+            self._reply = asyncio.create_task(self.respond(items, self._commit))
+            await asyncio.wait({self._reply})
+            if self._reply.cancelled():
+                # Superseded by newer input: answer everything together next round
+                self.pending = items + self.pending
+                self._wakeup.set()
+                metrics.inc("interview_turns_total", help="Interviewer turns by outcome", result="superseded")
+                continue
+            if self._reply.exception() is not None:
+                print(f"Error answering turn: {self._reply.exception()}")
+                metrics.inc("interview_turns_total", help="Interviewer turns by outcome", result="failed")
+            else:
+                metrics.inc("interview_turns_total", help="Interviewer turns by outcome", result="answered")
+            if self.pending:
+                self._wakeup.set()
@@ -0,0 +1,88 @@
+from services import prompts
+from services.llm import parse_json
+from services.scheduler import Priority
+
+class ConversationContext:
+    """
+    Keeps the prompt sent to the model for each interview turn at a flat size.
+
+    The model sees the system prompt, a running summary of older turns plus the
+    topic tracker's state, and only the last few exchanges verbatim. Exchanges that
+    fall out of the window are queued as "pending" (still sent verbatim) until a
+    background fold merges them into the summary.
+
+    All state lives in a plain dict so it can be stored with the session and
+    picked up by any worker.
+    """
+    def __init__(self, state: dict, window_turns: int = 6, fold_batch_turns: int = 4):
+        self.state = state
+        self.window_turns = window_turns
+        self.fold_batch_turns = fold_batch_turns
+
+    @staticmethod
+    def new_state(system_prompt: str, ack: str) -> dict:
+        return {
+            "system_prompt": system_prompt,
+            "ack": ack,
+            "summary": "",
+            "pending": [],  # exchanges evicted from the window, not yet summarized
+            "recent": [],  # last window_turns exchanges as [user_text, model_text]
+            "turns": 0
+        }
+
+    def build(self, message: str, topic_state: str = "") -> list[dict]:
+        """
+        Returns the contents for the model's next reply to message. topic_state is
+        the topic tracker's current view of the interview plan.
+        """
+        contents = [
+            {"role": "user", "parts": [self.state["system_prompt"]]},
+            {"role": "model", "parts": [self.state["ack"]]}
+        ]
+        notes = self.notes(topic_state)
+        if notes:
+            contents.append({"role": "user", "parts": [f"[Interview notes so far]\n{notes}"]})
+            contents.append({"role": "model", "parts": ["Noted. I will continue from here."]})
+        for user_text, model_text in self.state["pending"] + self.state["recent"]:
+            contents.append({"role": "user", "parts": [user_text]})
+            contents.append({"role": "model", "parts": [model_text]})
+        contents.append({"role": "user", "parts": [message]})
+        return contents
+
+    def notes(self, topic_state: str = "") -> str:
+        lines = []
+        if self.state["summary"]:
+            lines.append(f"Summary: {self.state['summary']}")
+        if topic_state:
+            lines.append(f"Topic tracker:\n{topic_state}")
+        return "\n".join(lines)
+
+    def record(self, message: str, reply: str):
+        self.state["recent"].append([message, reply])
+        self.state["turns"] += 1
+        overflow = len(self.state["recent"]) - self.window_turns
+        if overflow > 0:
+            self.state["pending"].extend(self.state["recent"][:overflow])
+            del self.state["recent"][:overflow]
+
+    def needs_fold(self) -> bool:
+        return len(self.state["pending"]) >= self.fold_batch_turns
+
+    async def fold(self, llm):
+        """
+        Merges pending exchanges into the running summary with one small LLM call.
+        On failure the exchanges stay pending and are retried on the next fold.
+        """
+        batch = list(self.state["pending"])
+        if not batch:
+            return
+        transcript = "\n".join(f"Candidate: {user_text}\nInterviewer: {model_text}" for user_text, model_text in batch)
+        prompt = prompts.context_fold_prompt(self.state["summary"], transcript)
+        raw = await llm.generate(prompt, priority=Priority.BACKGROUND)
+        notes = parse_json(raw)
+        if not isinstance(notes, dict) or not notes.get("summary"):
+            raise ValueError("Context summary was not valid JSON")
+
+        self.state["summary"] = str(notes["summary"])
+        # New exchanges may have been evicted while the fold was running
+        del self.state["pending"][:len(batch)]
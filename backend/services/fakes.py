@@ -0,0 +1,116 @@
+# Deterministic local stand-ins for Gemini and Edge TTS, used for development and load tests
+# (LLM_BACKEND=fake / TTS_BACKEND=fake). They mimic the calls the app makes, with configurable latency.
+import asyncio
+import hashlib
+import json
+from services import prompts
+
+FAKE_QUESTIONS = [
+    "Thanks. Can you walk me through the architecture of the most complex project on your resume?",
+    "Interesting. How did you measure whether that change actually improved performance?",
+    "Good. What trade-offs did you consider when choosing that database?",
+    "Let's switch topics. How do you approach debugging a production issue you cannot reproduce locally?",
+    "Tell me about a time you disagreed with a teammate on a technical decision. What happened?",
+    "How would you design a rate limiter for a public API?",
+]
+
+FAKE_ANALYSIS = {
+    "key_skills": ["Python", "FastAPI", "PostgreSQL", "React"],
+    "experience_level": "Mid",
+    "skill_gaps": {
+        "missing_technologies": ["Kubernetes"],
+        "weak_areas": ["System design"],
+        "recommendations": ["Practice designing distributed systems"]
+    },
+    "interview_topics": [
+        {"topic": "Python backend development", "priority": "high", "category": "technical"},
+        {"topic": "Database design", "priority": "high", "category": "technical"},
+        {"topic": "Frontend with React", "priority": "medium", "category": "technical"},
+        {"topic": "Team collaboration", "priority": "medium", "category": "behavioral"},
+        {"topic": "Side projects", "priority": "low", "category": "project"}
+    ],
+    "interview_focus_areas": ["APIs", "Databases", "Teamwork"],
+    "strengths": ["Backend development"],
+    "top_skill_gaps": ["Kubernetes", "System design", "Observability", "Testing strategy", "Cloud cost awareness"],
+    "career_trajectory": "Steady growth towards a senior backend role",
+    "resume_digest": "Backend engineer at Example Corp (2019-2024) building Python/FastAPI services and PostgreSQL schemas. B.Tech in Computer Science."
+}
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class _FakeStream:
+    def __init__(self, text: str, chunk_delay: float, chunk_words: int = 3):
+        words = text.split(" ")
+        self._chunks = [" ".join(words[i:i + chunk_words]) + " " for i in range(0, len(words), chunk_words)]
+        self._chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._chunk_delay)
+            yield _FakeResponse(chunk)
+
+class FakeModel:
+    """
+    Answers every prompt the app sends with a canned, deterministic reply.
+    latency is the time to the first token; tokens_per_second paces streamed chunks.
+    """
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 50.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    async def generate_content_async(self, prompt, stream: bool = False):
+        text = self._reply(_prompt_text(prompt))
+        await asyncio.sleep(self.latency)
+        if stream:
+            return _FakeStream(text, chunk_delay=3 / self.tokens_per_second)
+        # Non-streamed replies arrive all at once, after the whole "generation" time
+        await asyncio.sleep(len(text.split()) / self.tokens_per_second)
+        return _FakeResponse(text)
+
+    def _reply(self, prompt: str) -> str:
+        if prompts.VALIDATION_TASK in prompt:
+            return "RESUME"
+        if prompts.ANALYSIS_TASK in prompt:
+            return json.dumps(FAKE_ANALYSIS)
+        if prompts.SKILL_GAPS_TASK in prompt:
+            return "1. Kubernetes\n2. System design\n3. Observability\n4. Testing strategy\n5. Cloud cost awareness"
+        if prompts.CONTEXT_FOLD_TASK in prompt:
+            return json.dumps({"summary": "The candidate discussed their backend work in reasonable depth."})
+        if prompts.SEGMENT_ASSESSMENT_TASK in prompt:
+            return json.dumps({
+                "topics": [{"topic": "Python backend development", "assessment": "Gave a clear, practical answer.", "score": 7}],
+                "strengths": ["Clear explanations"],
+                "weaknesses": ["Limited depth on scaling"],
+                "quotes": ["I profiled it before changing anything."]
+            })
+        if prompts.CODE_SCORE_TASK in prompt:
+            return "- Code Correctness: 7/10\n- Code Quality: 7/10\n- Efficiency: 6/10\n- Edge Cases: 5/10\n- Overall Coding Score: 6/10\n- Feedback: Works for the common case."
+        if prompts.REPORT_SUMMARY_TASK in prompt:
+            return "## INTERVIEW REPORT CARD\n\n### Overall Score: 7.0/10\nA solid mid-level interview (generated by the fake model)."
+        # Interview turn: pick a question deterministically from the conversation so far
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        return FAKE_QUESTIONS[digest % len(FAKE_QUESTIONS)]
+
+def _prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(str(part) for content in prompt for part in content["parts"])
+
+# One silent MPEG-2 Layer III frame (24 kHz, 32 kbps, mono): 96 bytes, 24 ms of audio.
+# Real, decodable MP3 keeps browser clients and load tests on the normal code path.
+SILENT_MP3_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC4]) + bytes(92)
+
+class FakeTTSBackend:
+    """
+    Returns silent MP3 roughly as long as the text would take to speak.
+    """
+    def __init__(self, latency: float = 0.2, chars_per_second: float = 15.0):
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+
+    async def synthesize(self, text: str, voice: str) -> bytes:
+        await asyncio.sleep(self.latency)
+        frames = max(1, int(len(text) / self.chars_per_second / 0.024))
+        return SILENT_MP3_FRAME * frames
@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import time
+import json
+import re
+import threading
+from services.scheduler import LLMScheduler, Priority
+from services.metrics import metrics
+
+class LLMTimeoutError(Exception):
+    pass
+
+def retryable_errors() -> tuple:
+    """
+    Transient API failures worth retrying: quota (429), overload (503) and server errors.
+    Only evaluated when a call fails, so google.api_core is not imported at startup.
+    """
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+
+class LazyModel:
+    """
+    Builds the model client with factory() on first use instead of at import.
+    The first call loads it in a worker thread so the event loop keeps serving
+    other requests; load() can also be called ahead of time to warm up.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                self._model = self.factory()
+            return self._model
+
+    async def generate_content_async(self, *args, **kwargs):
+        model = self._model or await asyncio.to_thread(self.load)
+        return await model.generate_content_async(*args, **kwargs)
+
+class LLMService:
+    def __init__(self, model, scheduler: LLMScheduler, timeout: float = 60.0):
+        self.model = model
+        self.scheduler = scheduler
+        self.timeout = timeout
+
+    async def generate(self, prompt, priority: Priority = Priority.ANALYSIS, timeout: float = None) -> str:
+        """
+        Runs a prompt (text or a list of chat contents) without blocking the event loop
+        and returns the reply text. Retries transient API errors with backoff.
+        """
+        for attempt in itertools.count():
+            try:
+                async with self.scheduler.slot(priority):
+                    with metrics.span("llm", priority=priority.name.lower()):
+                        response = await self._with_timeout(self.model.generate_content_async(prompt), timeout)
+                    return response.text
+            except retryable_errors() as e:
+                await self._before_retry(e, attempt)
+
+    async def stream(self, prompt, priority: Priority = Priority.INTERACTIVE, timeout: float = None):
+        """
+        Runs a prompt (text or a list of chat contents) and yields the reply text as the
+        model produces it. The timeout applies to the wait for each chunk rather than to
+        the whole reply. Only failures before the first chunk are retried.
+        """
+        for attempt in itertools.count():
+            started = False
+            try:
+                async with self.scheduler.slot(priority):
+                    with metrics.span("llm_stream", priority=priority.name.lower()):
+                        requested_at = time.perf_counter()
+                        response = await self._with_timeout(self.model.generate_content_async(prompt, stream=True), timeout)
+                        chunks = response.__aiter__()
+                        while True:
+                            try:
+                                chunk = await self._with_timeout(chunks.__anext__(), timeout)
+                            except StopAsyncIteration:
+                                return
+                            if chunk.text:
+                                if not started:
+                                    started = True
+                                    metrics.observe(
+                                        "llm_first_token_seconds", time.perf_counter() - requested_at,
+                                        help="Time from LLM request to first streamed text", priority=priority.name.lower()
+                                    )
+                                yield chunk.text
+            except retryable_errors() as e:
+                if started:
+                    raise
+                await self._before_retry(e, attempt)
+
+    async def _before_retry(self, error: Exception, attempt: int):
+        if attempt >= self.scheduler.max_retries:
+            raise error
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, google_exceptions.ResourceExhausted):
+            self.scheduler.penalize()
+        self.scheduler.retries += 1
+        delay = self.scheduler.backoff_delay(attempt)
+        print(f"LLM call failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def _with_timeout(self, coro, timeout: float = None):
+        # wait_for cancels the underlying request on timeout, and the whole call is
+        # cancelled with its caller (e.g. when the handler task is torn down)
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"The AI model did not respond within {timeout:.0f} seconds")
+
+def parse_json(text: str):
+    """
+    Parses a JSON reply, tolerating the markdown fences small models like to add.
+    Returns None if the reply is not valid JSON.
+    """
+    cleaned = re.sub(r"^```(?:json)?|```$", "", text.strip()).strip()
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,118 @@
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Session the current task is working for. Set once per request/WebSocket; tasks
+# created from there inherit it, so spans deep in services are tagged automatically.
+current_session: ContextVar = ContextVar("current_session", default=None)
+
+# Latency buckets in seconds, from socket sends (ms) up to slow LLM replies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Payload sizes in bytes, from a short audio sentence up to a long non-streamed reply
+SIZE_BUCKETS = (1024, 4096, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+class Histogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text format.
+
+    Stage timings are histograms labelled only by stage (session ids would explode
+    label cardinality). The most recent spans, tagged with their session, are kept
+    in a ring buffer so a single slow interview can still be inspected.
+    """
+    def __init__(self, recent_spans: int = 1000):
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}  # (name, labels) -> float
+        self.gauges = {}  # name -> (help, callback)
+        self.help = {}
+        self.spans = deque(maxlen=recent_spans)
+
+    def observe(self, name: str, value: float, help: str = "", buckets: tuple = DEFAULT_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        if help:
+            self.help.setdefault(name, help)
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+        if help:
+            self.help.setdefault(name, help)
+
+    def gauge(self, name: str, help: str, callback):
+        self.gauges[name] = (help, callback)
+
+    @contextmanager
+    def span(self, stage: str, **tags):
+        """
+        Times a block of work: `with metrics.span("tts"): ...` (works in async code too).
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self.observe("interview_stage_seconds", duration, help="Time spent per processing stage", stage=stage)
+            self.spans.append({
+                "stage": stage,
+                "session_id": current_session.get(),
+                "seconds": round(duration, 4),
+                "at": time.time(),
+                **tags
+            })
+
+    def recent_spans(self, session_id: str = None) -> list[dict]:
+        return [span for span in self.spans if session_id is None or span["session_id"] == session_id]
+
+    def render(self, extra_gauges: dict = None) -> str:
+        lines = []
+        seen = set()
+
+        def header(name: str, kind: str, help: str):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            header(name, "histogram", self.help.get(name, ""))
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, "counter", self.help.get(name, ""))
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        gauges = {name: (help, callback()) for name, (help, callback) in self.gauges.items()}
+        gauges.update(extra_gauges or {})
+        for name, (help, value) in sorted(gauges.items()):
+            header(name, "gauge", help)
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def _labels(pairs: tuple) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+metrics = Metrics()
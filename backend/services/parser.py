@@ -1,35 +1,71 @@
-import re
-import io
-import pypdf
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import PDF_MAX_BYTES, PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_PARSE_TIMEOUT_SECONDS, PDF_WORKERS
+from services import pdf_extract
+from services.metrics import metrics
 
 class ResumeParser:
-    def __init__(self):
-        # Compiling regex patterns for PII sanitization
-        # Email
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        # Phone numbers (generic international and US formats)
-        self.phone_pattern = re.compile(r'(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}')
-        # URL/Links (optional, but sometimes contain PII or social profiles) -> keeping for now, maybe sanitize if needed.
-        
+    def __init__(self, max_bytes: int, max_pages: int, max_chars: int, timeout: float, workers: int):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.workers = workers
+        # PDF parsing is CPU-bound and can be slow on hostile input, so it runs in a
+        # small process pool (created on first use) rather than on the event loop
+        self._pool = None
+
     def sanitize(self, text: str) -> str:
-        text = self.email_pattern.sub("[EMAIL REDACTED]", text)
-        text = self.phone_pattern.sub("[PHONE REDACTED]", text)
-        return text
+        return pdf_extract.sanitize(text)
 
     async def parse(self, file_content: bytes) -> str:
         """
         Extracts text from PDF bytes and sanitizes PII.
+        Raises ValueError if the file is too large or takes too long to process.
         """
-        try:
-            pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            cleaned_text = self.sanitize(text)
-            return cleaned_text
-        except Exception as e:
-            print(f"Error parsing PDF: {e}")
-            return ""
+        if len(file_content) > self.max_bytes:
+            raise ValueError(f"PDF is too large. Please upload a resume under {self.max_bytes // (1024 * 1024)} MB.")
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                job = loop.run_in_executor(pool, pdf_extract.extract_text, file_content, self.max_pages, self.max_chars)
+                with metrics.span("pdf_parse", bytes=len(file_content)):
+                    return await asyncio.wait_for(job, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self._reset_pool(pool)
+                raise ValueError("PDF took too long to process. Please upload a simpler PDF.")
+            except BrokenProcessPool:
+                # A worker died (killed, or out of memory). The pool is unusable from
+                # then on, so replace it and try once more before giving up on the file
+                self._reset_pool(pool)
+                metrics.inc("pdf_pool_resets_total", help="PDF worker pools replaced after a worker died")
+                if attempt:
+                    raise ValueError("PDF could not be processed. Please try again or upload a different PDF.")
+            except Exception as e:
+                print(f"Error parsing PDF: {e}")
+                return ""
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        # A timed-out job keeps its worker busy forever, so kill the workers and
+        # start a fresh pool for the next upload
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
 
-parser = ResumeParser()
+parser = ResumeParser(
+    max_bytes=PDF_MAX_BYTES,
+    max_pages=PDF_MAX_PAGES,
+    max_chars=PDF_MAX_CHARS,
+    timeout=PDF_PARSE_TIMEOUT_SECONDS,
+    workers=PDF_WORKERS
+)
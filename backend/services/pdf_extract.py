@@ -0,0 +1,32 @@
+# PDF text extraction that runs inside the parser's worker processes.
+# Kept free of app imports so spawning a worker stays cheap.
+import re
+import io
+import pypdf
+
+# Compiling regex patterns for PII sanitization
+# Email
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Phone numbers (generic international and US formats)
+PHONE_PATTERN = re.compile(r'(\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}')
+
+def sanitize(text: str) -> str:
+    text = EMAIL_PATTERN.sub("[EMAIL REDACTED]", text)
+    text = PHONE_PATTERN.sub("[PHONE REDACTED]", text)
+    return text
+
+def extract_text(file_content: bytes, max_pages: int, max_chars: int) -> str:
+    """
+    Extracts and sanitizes text page by page, stopping at max_pages or once
+    max_chars of text have been gathered (more than any prompt will use).
+    """
+    pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
+    pages = []
+    total_chars = 0
+    for page in pdf_reader.pages[:max_pages]:
+        page_text = sanitize((page.extract_text() or "") + "\n")
+        pages.append(page_text)
+        total_chars += len(page_text)
+        if total_chars >= max_chars:
+            break
+    return "".join(pages)[:max_chars]
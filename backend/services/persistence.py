@@ -0,0 +1,169 @@
+# Write-behind persistence of finished interviews
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+def build_record(session_id: str, session_data: dict, report: str) -> dict:
+    """
+    Everything worth keeping once an interview has ended, as one flat row.
+    """
+    return {
+        "id": session_id,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "duration": session_data.get("duration", 15),
+        "analysis": session_data.get("analysis", ""),
+        "skill_gaps": session_data.get("skill_gaps", ""),
+        "transcript": "\n".join(session_data.get("conversation", [])),
+        "code_submissions": session_data.get("code_submissions", []),
+        "topics_covered": session_data.get("topics_covered", []),
+        "report": report,
+    }
+
+class JSONLSink:
+    """
+    Appends records to a local JSON Lines file. A stand-in for the real store in
+    development and tests; the file is easy to inspect and to replay later.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def write(self, records: list[dict]):
+        await asyncio.to_thread(self._append, records)
+
+    def _append(self, records: list[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+class SupabaseSink:
+    """
+    Upserts records into a Supabase table (keyed on "id", so a retried batch never duplicates rows).
+    The client comes from get_client on the first write, so startup never waits on it.
+    """
+    def __init__(self, get_client, table: str):
+        self.get_client = get_client
+        self.table = table
+
+    async def write(self, records: list[dict]):
+        # supabase-py is synchronous
+        await asyncio.to_thread(lambda: self.get_client().table(self.table).upsert(records).execute())
+
+class PersistenceQueue:
+    """
+    Takes finished interviews off the request path: end_interview enqueues a record
+    and returns, and a background task writes records in batches.
+
+    A batch is written once batch_size records are waiting or flush_interval has
+    passed. Failed writes are retried with jittered exponential backoff; a batch
+    that still fails goes back to the queue for the next flush. The queue is
+    bounded - when the store is down for long, the oldest records are dropped.
+    """
+    def __init__(self, sink, batch_size: int = 20, flush_interval: float = 5.0, max_retries: int = 3,
+                 max_queued: int = 1000, backoff_base: float = 0.5, backoff_cap: float = 10.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_queued = max_queued
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._queue = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self.last_flush_at = None
+
+    def enqueue(self, record: dict):
+        self._queue.append(record)
+        overflow = len(self._queue) - self.max_queued
+        if overflow > 0:
+            del self._queue[:overflow]
+            self.dropped += overflow
+            print(f"Warning: persistence queue full, dropped {overflow} record(s)")
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the background task and makes one last attempt to write what is queued.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        while self._queue:
+            if not await self.flush():
+                break
+
+    async def flush(self) -> bool:
+        """
+        Writes up to one batch. Returns False if the batch could not be written.
+        """
+        batch = self._queue[:self.batch_size]
+        if not batch:
+            return True
+        del self._queue[:len(batch)]
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.sink.write(batch)
+                self.written += len(batch)
+                self.last_flush_at = time.time()
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Warning: persisting {len(batch)} interview(s) failed, will retry later: {e}")
+                    break
+                await asyncio.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt)))
+        self.failed_batches += 1
+        # Back to the front so the next flush tries these first
+        self._queue[:0] = batch
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "sink": type(self.sink).__name__,
+            "queued": len(self._queue),
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+            "last_flush_at": self.last_flush_at,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue:
+                if not await self.flush():
+                    break  # store is struggling - wait for the next interval
+                if len(self._queue) < self.batch_size:
+                    break  # a partial batch waits for the interval
+
+def create_persistence_sink(url: str, get_supabase=None):
+    """
+    "none" disables persistence, "jsonl:///path/to/file.jsonl" writes to a local
+    file, "supabase://table" upserts into that Supabase table. get_supabase returns
+    the client (None if not configured) and is only called once a batch is written.
+    """
+    if not url or url == "none":
+        return None
+    if url.startswith("jsonl://"):
+        return JSONLSink(url[len("jsonl://"):])
+    if url.startswith("supabase://"):
+        if get_supabase is None:
+            print("Warning: Supabase is not configured, finished interviews will not be persisted")
+            return None
+        return SupabaseSink(get_supabase, url[len("supabase://"):] or "interview_records")
+    raise ValueError(f"Unsupported PERSISTENCE_URL: {url}")
@@ -0,0 +1,82 @@
+import asyncio
+from services.metrics import metrics
+from services.scheduler import Priority
+
+class QuestionPrefetcher:
+    """
+    Prepares the opening question for the next planned topic, text and audio,
+    while the candidate is still answering the last question on the current one.
+
+    When that answer closes the topic the prepared question is served right away
+    instead of waiting on the model and TTS. A prepared question is only valid for
+    the topic it was made for; anything else falls back to normal generation.
+    One prefetch per session at a time, kept in session["prefetch"] (runtime only).
+    """
+    def __init__(self, llm, tts):
+        self.llm = llm
+        self.tts = tts
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+
+    def start(self, session_data: dict, topic: str, contents: list, audio_format):
+        current = session_data.get("prefetch")
+        if current is not None:
+            if current["topic"] == topic:
+                return
+            self.discard(session_data)
+        session_data["prefetch"] = {
+            "topic": topic,
+            "task": asyncio.create_task(self._prepare(contents, audio_format))
+        }
+
+    def take(self, session_data: dict, topic: str):
+        """
+        Returns {"text", "audio"} prepared for topic, or None on a miss.
+        A prefetch that has not finished is cancelled rather than awaited: it runs at
+        background priority, and the live turn must not wait behind background work.
+        """
+        current = session_data.pop("prefetch", None)
+        if current is not None and (current["topic"] != topic or not current["task"].done()):
+            current["task"].cancel()
+            self._count("wasted")
+            current = None
+        prepared = None
+        if current is not None and not current["task"].cancelled():
+            error = current["task"].exception()
+            if error is not None:
+                print(f"Warning: question prefetch failed: {error}")
+            else:
+                prepared = current["task"].result()
+        self._count("hit" if prepared else "miss")
+        return prepared
+
+    def discard(self, session_data: dict):
+        current = session_data.pop("prefetch", None)
+        if current is not None:
+            current["task"].cancel()
+            self._count("wasted")
+
+    def stats(self) -> dict:
+        served = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "hit_rate": round(self.hits / served, 3) if served else 0.0,
+        }
+
+    async def _prepare(self, contents: list, audio_format) -> dict:
+        # Speculative work must never delay a live turn
+        text = (await self.llm.generate(contents, priority=Priority.BACKGROUND)).strip()
+        audio = await self.tts.generate_audio(text, audio_format)
+        return {"text": text, "audio": audio}
+
+    def _count(self, result: str):
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        else:
+            self.wasted += 1
+        metrics.inc("question_prefetch_total", help="Prefetched next-topic questions by outcome", result=result)
@@ -0,0 +1,314 @@
+# Prompt templates. The parts that only depend on the interview settings are built
+# once per (persona, type, difficulty) and reused by every session.
+from functools import lru_cache
+
+# Persona-specific behaviors
+PERSONA_TRAITS = {
+    "friendly": {
+        "name": "Shreya",
+        "style": "warm, supportive, and encouraging. Give positive feedback frequently. Help candidates when they struggle.",
+        "greeting": "Hi there! I'm Shreya. Thanks so much for joining me today! I've had a chance to look at your resume - really impressive stuff! How are you feeling today?"
+    },
+    "balanced": {
+        "name": "Shreya",
+        "style": "professional, fair, and constructive. Give balanced feedback. Ask follow-up questions to probe deeper.",
+        "greeting": "Hello! I'm Shreya. Thanks for joining me today. I've reviewed your resume, and it looks good. How are you doing today?"
+    },
+    "strict": {
+        "name": "Shreya",
+        "style": "rigorous, challenging, and demanding. Push candidates to think harder. Ask tough follow-up questions. Don't accept vague answers.",
+        "greeting": "Good day. I'm Shreya, and I'll be conducting your technical interview. I've reviewed your resume. Let's get started - we have limited time."
+    }
+}
+
+# The interviewer only needs the gist of the resume; the full text is sent to the model once, for analysis
+DIGEST_FALLBACK_CHARS = 1500
+
+# The task line of each prompt that is not an interview turn. services/fakes.py
+# recognises prompts by these, so the fake model follows any change to the wording.
+VALIDATION_TASK = "determine if it is a RESUME/CV or not."
+ANALYSIS_TASK = "Provide a comprehensive analysis in the following JSON format:"
+SKILL_GAPS_TASK = "Based on this resume, list the TOP 5 skill gaps that should be addressed:"
+CONTEXT_FOLD_TASK = "You keep running notes for an ongoing job interview."
+SEGMENT_ASSESSMENT_TASK = "You are taking notes for the report card of an ongoing job interview."
+CODE_SCORE_TASK = "Score this code submitted by a candidate during a job interview."
+REPORT_SUMMARY_TASK = "The interview is complete. Write the opening sections of the Report Card using ONLY"
+
+SCORING_GUIDELINES = """
+    SCORING GUIDELINES (be honest and specific):
+    - 1-3: Poor (wrong answers, fundamental misunderstandings, couldn't answer)
+    - 4-5: Below Average (partial knowledge, struggled to explain, major gaps)
+    - 6-7: Average (correct but basic answers, could go deeper)
+    - 8-9: Good (strong understanding, clear explanations, good examples)
+    - 10: Excellent (exceptional depth, went above and beyond)
+"""
+
+TOPIC_STRATEGY = """
+    TOPIC COVERAGE STRATEGY:
+    1. Start with HIGH priority topics first
+    2. Naturally transition between topics - don't abruptly switch
+    3. Ask 1-2 questions per topic before moving on
+    4. If the candidate demonstrates strong knowledge, briefly acknowledge and move to next topic
+    5. If they struggle, probe a bit deeper but don't get stuck - move on after 2-3 attempts
+    6. Ensure you cover at least the HIGH and MEDIUM priority topics
+    7. Follow the topic tracker in the interview notes: it lists the topics covered, the current one with its time budget, and what is still open
+    8. Near the end of the interview, if you haven't covered important topics, ask about them directly
+    """
+
+def persona_traits(persona: str) -> dict:
+    return PERSONA_TRAITS.get(persona, PERSONA_TRAITS["balanced"])
+
+def validation_prompt(resume_text: str) -> str:
+    return f"""
+        Analyze the following document content and {VALIDATION_TASK}
+
+        Document content:
+        {resume_text[:2000]}  # First 2000 chars for quick validation
+
+        A resume/CV typically contains:
+        - Personal information (name, contact details)
+        - Work experience or employment history
+        - Education background
+        - Skills or competencies
+        - Sometimes: projects, certifications, achievements
+
+        Respond with ONLY one of these two words:
+        - "RESUME" if this appears to be a resume or CV
+        - "NOT_RESUME" if this is some other type of document (research paper, article, report, random text, etc.)
+        """
+
+def analysis_prompt(resume_text: str) -> str:
+    """
+    The only prompt that carries the full resume. It also asks for the skill gap
+    list and a condensed digest, which later prompts use instead of the resume.
+    """
+    return f"""
+        You are an expert technical interviewer and career coach. Analyze the following resume:
+        {resume_text}
+
+        {ANALYSIS_TASK}
+        {{
+            "key_skills": ["skill1", "skill2", ...],
+            "experience_level": "Junior/Mid/Senior/Lead",
+            "skill_gaps": {{
+                "missing_technologies": ["tech1", "tech2"],
+                "weak_areas": ["area1", "area2"],
+                "recommendations": ["recommendation1", "recommendation2"]
+            }},
+            "top_skill_gaps": ["the 5 most important skill gaps to address, each specific and actionable"],
+            "interview_topics": [
+                {{"topic": "Topic name based on resume", "priority": "high/medium/low", "category": "technical/behavioral/project"}},
+                {{"topic": "Another topic", "priority": "medium", "category": "technical"}}
+            ],
+            "interview_focus_areas": ["area1", "area2", "area3"],
+            "strengths": ["strength1", "strength2"],
+            "career_trajectory": "brief assessment of career growth potential",
+            "resume_digest": "at most 150 words: roles with employers and years, notable projects with their technologies, education"
+        }}
+
+        IMPORTANT for interview_topics:
+        - Extract 5-8 specific topics from the resume that should be covered in an interview
+        - Topics should include: key technical skills, major projects, work experiences, soft skills
+        - Assign priority: high (core skills/recent experience), medium (supporting skills), low (nice to explore)
+        - Ensure topics cover the breadth of the candidate's background
+
+        Be specific about skill gaps - identify what modern technologies or practices might be missing.
+        Return ONLY valid JSON, no markdown or extra text.
+        """
+
+def skill_gaps_prompt(resume_text: str) -> str:
+    # Only used when the analysis reply cannot be parsed
+    return f"""
+        {SKILL_GAPS_TASK}
+        {resume_text}
+
+        Return as a simple numbered list. Be specific and actionable.
+        """
+
+def skill_gaps_from_analysis(analysis: dict) -> str:
+    """
+    Numbered list of the top skill gaps from the analysis JSON, or "" if it has none.
+    """
+    gaps = analysis.get("top_skill_gaps")
+    if not isinstance(gaps, list) or not gaps:
+        details = analysis.get("skill_gaps")
+        if not isinstance(details, dict):
+            return ""
+        gaps = list(details.get("missing_technologies") or []) + list(details.get("weak_areas") or [])
+    gaps = [str(gap).strip() for gap in gaps if str(gap).strip()][:5]
+    return "\n".join(f"{i}. {gap}" for i, gap in enumerate(gaps, 1))
+
+def resume_digest(resume_text: str, analysis: dict = None) -> str:
+    digest = (analysis or {}).get("resume_digest")
+    if isinstance(digest, str) and digest.strip():
+        return digest.strip()
+    return resume_text[:DIGEST_FALLBACK_CHARS]
+
+@lru_cache(maxsize=64)
+def interviewer_preamble(persona: str, interview_type: str, difficulty: str) -> str:
+    traits = persona_traits(persona)
+    return f"""
+    You are '{traits["name"]}', a senior technical interviewer with the following style: {traits["style"]}
+
+    Interview type: {interview_type} (technical = coding/system design, behavioral = STAR questions, mixed = both)
+    Difficulty level: {difficulty} (junior = basic concepts, mid = moderate complexity, senior = advanced topics, lead = architecture decisions)
+
+    Your goal is to conduct a {difficulty}-level {interview_type} interview.
+    Keep your responses concise (1-3 sentences) to allow for conversation.
+    Wait for their answer before asking the next question.
+    Identify skill gaps based on their responses and resume.
+    """
+
+@lru_cache(maxsize=64)
+def coding_instructions(interview_type: str, difficulty: str, duration: int) -> str:
+    # Coding question instructions for longer interviews (>=10 minutes)
+    if duration < 10 or interview_type not in ["technical", "mixed"]:
+        return ""
+    return f"""
+
+    CODING QUESTION REQUIREMENT:
+    Since this is a {duration}-minute interview, you MUST ask at least ONE coding problem.
+    - Ask a coding question appropriate for {difficulty} level (e.g., array manipulation, string processing, algorithm design)
+    - Clearly state the problem, input format, and expected output
+    - Tell the candidate to use the code editor on the right side of the screen to write their solution
+    - Tell them to click 'Submit Code' when they are done
+    - After they submit, you will receive their code and should provide feedback on it
+    - Evaluate: correctness, code quality, efficiency, and edge case handling
+    """
+
+def topics_instruction(interview_topics: list[dict], duration: int, minutes_per_topic: int) -> str:
+    if not interview_topics:
+        return ""
+    topics_list = "\n".join([f"    - [{t.get('priority', 'medium').upper()}] {t.get('topic', 'Unknown')} ({t.get('category', 'general')})" for t in interview_topics])
+    return f"""
+
+    TOPICS TO COVER (from candidate's resume):
+    You have {duration} minutes total. Aim to spend ~{minutes_per_topic} minutes per topic.
+{topics_list}
+    {TOPIC_STRATEGY}"""
+
+def system_prompt(persona: str, interview_type: str, difficulty: str, duration: int, digest: str,
+                  interview_topics: list[dict], minutes_per_topic: int) -> str:
+    return f"""{interviewer_preamble(persona, interview_type, difficulty)}
+    The candidate's background (condensed from their resume):
+    {digest}
+    {topics_instruction(interview_topics, duration, minutes_per_topic)}
+    {coding_instructions(interview_type, difficulty, duration)}
+    """
+
+def next_topic_prompt(current_topic: str, next_topic: str) -> str:
+    # Written before the candidate's answer exists, so the reply must not depend on it
+    return (
+        f"[Interviewer note: the candidate is finishing their answer about {current_topic}. "
+        f"Acknowledge it in one short, generic sentence without commenting on specifics, "
+        f"then move on and ask your first question about {next_topic}.]"
+    )
+
+def code_review_prompt(code: str, language: str) -> str:
+    return f"""The candidate has submitted their code solution:
+
+Language: {language}
+```{language}
+{code}
+```
+
+Please review this code and provide brief feedback on:
+1. Does it look correct for the problem asked?
+2. Code quality and readability
+3. Any suggestions for improvement
+
+Keep your response concise (2-4 sentences)."""
+
+def context_fold_prompt(summary: str, transcript: str) -> str:
+    return f"""
+        {CONTEXT_FOLD_TASK}
+
+        Current summary: {summary or "(none yet)"}
+
+        New exchanges:
+        {transcript}
+
+        Update the notes. Return ONLY valid JSON, no markdown:
+        {{"summary": "at most 120 words: what was asked, how the candidate answered, notable strengths and weaknesses"}}
+        """
+
+def segment_assessment_prompt(segment: str, topics: list[str]) -> str:
+    return f"""
+        {SEGMENT_ASSESSMENT_TASK}
+        Planned topics: {", ".join(topics) or "(none)"}
+
+        Transcript segment:
+        {segment}
+
+        Assess ONLY what the candidate actually said in this segment.
+        {SCORING_GUIDELINES}
+        Return ONLY valid JSON, no markdown:
+        {{"topics": [{{"topic": "topic discussed (use the planned topic name when it matches)", "assessment": "one sentence based on the actual answers", "score": 1-10}}],
+          "strengths": ["specific strength shown"],
+          "weaknesses": ["specific gap shown"],
+          "quotes": ["short notable verbatim quote from the candidate"]}}
+        Leave a list empty if there is nothing to report.
+        """
+
+def code_score_prompt(code: str, language: str) -> str:
+    return f"""
+        {CODE_SCORE_TASK}
+
+        ```{language}
+        {code}
+        ```
+
+        Return markdown in exactly this format:
+        - Code Correctness: [1-10]/10
+        - Code Quality: [1-10]/10
+        - Efficiency: [1-10]/10
+        - Edge Cases: [1-10]/10
+        - Overall Coding Score: [1-10]/10
+        - Feedback: (2-3 sentences of specific feedback on this code)
+        """
+
+def report_summary_prompt(duration: int, planned: str, context_summary: str, topic_lines: str, strengths: str,
+                          weaknesses: str, quotes: str, code_lines: str) -> str:
+    """
+    The report sections that need judgement. Every argument is already-formatted
+    notes text (see ReportBuilder.summary_prompt); the full transcript never goes in.
+    """
+    return f"""
+    {REPORT_SUMMARY_TASK}
+    the notes below, which were taken during the interview. Do not invent anything.
+
+    Interview Duration: {duration} minutes
+    Planned topics: {planned or "(none)"}
+    Interview summary: {context_summary or "(not available)"}
+
+    Topic assessments:
+{topic_lines}
+    Strengths shown: {strengths or "(none noted)"}
+    Weaknesses shown: {weaknesses or "(none noted)"}
+    Candidate quotes: {quotes or "(none noted)"}
+{code_lines}
+    {SCORING_GUIDELINES}
+    Output exactly these markdown sections and nothing else:
+
+    ## INTERVIEW REPORT CARD
+
+    ### Overall Score: [X.X]/10
+    (Justify based on the topic assessments)
+
+    ### Technical Assessment
+    - Demonstrated Proficiency: (Junior/Mid/Senior)
+    - Strengths Shown: (2-3 specific examples)
+    - Weaknesses Identified: (2-3 specific gaps)
+
+    ### Communication Quality
+    - Clarity: [1-10]/10
+    - Depth of Answers: [1-10]/10
+    - Technical Vocabulary: [1-10]/10
+
+    ### Key Quotes from Interview
+    (2-3 of the candidate quotes above)
+
+    ### Recommendations for Improvement
+    1. [Specific recommendation based on an observed weakness]
+    2. [Specific recommendation based on an observed weakness]
+    """
@@ -0,0 +1,124 @@
+from services import prompts
+from services.llm import parse_json
+from services.scheduler import Priority
+
+class ReportBuilder:
+    """
+    Builds the report card while the interview is running.
+
+    Every few exchanges the new part of the transcript is assessed in the background
+    (per-topic notes, strengths, weaknesses, quotes), and each code submission is
+    scored as soon as it arrives. Ending the interview then only assesses the last
+    few exchanges, writes the short summary sections from these notes, and appends
+    the precomputed topic and coding sections.
+
+    Like ConversationContext, all state is a plain dict stored with the session.
+    """
+    def __init__(self, state: dict, segment_turns: int = 4):
+        self.state = state
+        self.segment_turns = segment_turns
+
+    @staticmethod
+    def new_state() -> dict:
+        return {
+            "assessed_lines": 0,  # how much of session["conversation"] has been assessed
+            "topics": {},  # topic -> list of {"assessment", "score"}
+            "strengths": [],
+            "weaknesses": [],
+            "quotes": [],
+            "code_reviews": {}  # str(submission index) -> markdown review
+        }
+
+    def needs_assessment(self, conversation: list[str]) -> bool:
+        # Two conversation lines (candidate + interviewer) per exchange
+        return len(conversation) - self.state["assessed_lines"] >= self.segment_turns * 2
+
+    async def assess_segment(self, llm, conversation: list[str], topics: list[str], priority: Priority = Priority.BACKGROUND):
+        """
+        Assesses everything in the conversation that has not been assessed yet.
+        """
+        start = self.state["assessed_lines"]
+        end = len(conversation)
+        if start >= end:
+            return
+        segment = "\n".join(conversation[start:end])
+        prompt = prompts.segment_assessment_prompt(segment, topics)
+        notes = parse_json(await llm.generate(prompt, priority=priority))
+        if not isinstance(notes, dict):
+            raise ValueError("Segment assessment was not valid JSON")
+
+        for item in notes.get("topics", []):
+            if isinstance(item, dict) and item.get("topic"):
+                self.state["topics"].setdefault(str(item["topic"]), []).append({
+                    "assessment": str(item.get("assessment", "")),
+                    "score": item.get("score")
+                })
+        for key in ("strengths", "weaknesses", "quotes"):
+            self.state[key].extend(str(value) for value in notes.get(key, []) if value)
+        self.state["assessed_lines"] = end
+
+    def missing_code_reviews(self, code_submissions: list[dict]) -> list[int]:
+        return [i for i in range(len(code_submissions)) if str(i) not in self.state["code_reviews"]]
+
+    async def review_code(self, llm, index: int, submission: dict, priority: Priority = Priority.BACKGROUND):
+        prompt = prompts.code_score_prompt(submission["code"], submission["language"])
+        self.state["code_reviews"][str(index)] = (await llm.generate(prompt, priority=priority)).strip()
+
+    def summary_prompt(self, context_summary: str, duration: int, coverage: list[dict]) -> str:
+        """
+        Prompt for the sections that need judgement (score, recommendations). It only
+        carries the notes gathered during the interview, never the full transcript.
+        coverage is the topic tracker's per-topic view (see TopicTracker.coverage).
+        """
+        planned = ", ".join(
+            f"{t['topic']} ({t['mentions']} exchange(s), {t['minutes']} min)" if t["covered"] else f"{t['topic']} (not covered)"
+            for t in coverage
+        )
+        topic_lines = "\n".join(
+            f"    - {topic} (scores: {', '.join(str(n['score']) for n in notes)}): "
+            + " ".join(n["assessment"] for n in notes)
+            for topic, notes in self.state["topics"].items()
+        ) or "    (no topics were assessed)"
+        code_lines = "\n".join(
+            f"    Submission {int(i) + 1}: {review}" for i, review in self._sorted_code_reviews()
+        )
+        return prompts.report_summary_prompt(
+            duration, planned, context_summary, topic_lines,
+            "; ".join(self.state["strengths"]), "; ".join(self.state["weaknesses"]), " | ".join(self.state["quotes"]),
+            code_lines
+        )
+
+    def precomputed_sections(self, coverage: list[dict]) -> str:
+        """
+        Sections assembled directly from the notes and the topic tracker's coverage, with no LLM call.
+        """
+        sections = ["\n\n### Topics Actually Covered"]
+        if self.state["topics"]:
+            for topic, notes in self.state["topics"].items():
+                scores = [n["score"] for n in notes if isinstance(n["score"], (int, float))]
+                score = f" ({sum(scores) / len(scores):.1f}/10)" if scores else ""
+                sections.append(f"- **{topic}**{score}: {' '.join(n['assessment'] for n in notes)}")
+        else:
+            sections.append("- No topics were discussed in enough depth to assess.")
+
+        if self.state["code_reviews"]:
+            sections.append("\n### Coding Assessment")
+            for i, review in self._sorted_code_reviews():
+                sections.append(f"**Code Submission {int(i) + 1}**\n{review}\n")
+
+        if coverage:
+            sections.append("\n### Time per Topic")
+            sections.extend(
+                f"- {t['topic']} [{t['priority'].upper()}]: {t['minutes']} min, discussed in {t['mentions']} exchange(s)"
+                for t in coverage if t["covered"] or t["minutes"]
+            )
+
+        assessed = {topic.lower() for topic in self.state["topics"]}
+        not_covered = [t["topic"] for t in coverage if not t["covered"] and t["topic"].lower() not in assessed]
+        if not_covered:
+            sections.append("\n### Topics NOT Covered (From Resume)")
+            sections.extend(f"- {topic}: Not Assessed" for topic in not_covered)
+        return "\n".join(sections) + "\n"
+
+    def _sorted_code_reviews(self) -> list:
+        return sorted(self.state["code_reviews"].items(), key=lambda item: int(item[0]))
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from enum import IntEnum
+from services.metrics import metrics
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # live interview turns - the candidate is waiting on the reply
+    ANALYSIS = 1  # resume uploads and the final report
+    BACKGROUND = 2  # context summaries, incremental report notes
+
+class LLMScheduler:
+    """
+    Coordinates all model traffic from one worker.
+
+    Requests wait for a slot in priority order. A slot is granted when the
+    concurrency limit allows it and the token bucket (requests per minute, with a
+    small burst) has a token. A few slots are reserved for interactive turns, so a
+    burst of uploads or report work can never make a live candidate wait for capacity.
+    A rate of 0 turns the token bucket off, leaving only the concurrency limits.
+    """
+    def __init__(self, max_concurrency: int = 8, rate_per_minute: float = 30, burst: int = 5,
+                 reserved_interactive: int = 2, max_retries: int = 3, backoff_base: float = 1.0,
+                 backoff_cap: float = 20.0):
+        self.max_concurrency = max_concurrency
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.reserved_interactive = min(reserved_interactive, max_concurrency - 1)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._waiters = []  # heap of (priority, order, future)
+        self._order = itertools.count()
+        self._active = {priority: 0 for priority in Priority}
+        self._wakeup = None
+        self.retries = 0
+        self.throttled = 0
+
+    async def acquire(self, priority: Priority):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._dispatch()
+        queued_at = time.perf_counter()
+        try:
+            await future
+            metrics.observe(
+                "llm_queue_wait_seconds", time.perf_counter() - queued_at,
+                help="Time LLM calls waited for a scheduler slot", priority=priority.name.lower()
+            )
+        except asyncio.CancelledError:
+            # Granted just as the caller was cancelled - hand the slot back
+            if future.done() and not future.cancelled():
+                self.release(priority)
+            raise
+
+    def release(self, priority: Priority):
+        self._active[priority] -= 1
+        self._dispatch()
+
+    def slot(self, priority: Priority):
+        return _Slot(self, priority)
+
+    def penalize(self):
+        """
+        Called on a quota error: drain the bucket so every caller slows down together.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+        self.throttled += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter so retries from many sessions spread out
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "active": {priority.name.lower(): count for priority, count in self._active.items()},
+            "queued": sum(1 for _, _, future in self._waiters if not future.done()),
+            "tokens": round(self._tokens, 2),
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _dispatch(self):
+        self._refill()
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)  # cancelled while waiting
+                continue
+            active = sum(self._active.values())
+            limit = self.max_concurrency if priority == Priority.INTERACTIVE else self.max_concurrency - self.reserved_interactive
+            non_interactive = active - self._active[Priority.INTERACTIVE]
+            in_use = active if priority == Priority.INTERACTIVE else non_interactive
+            if in_use >= limit or active >= self.max_concurrency:
+                return  # a release will dispatch again
+            if self.rate > 0:
+                if self._tokens < 1:
+                    self._schedule_wakeup((1 - self._tokens) / self.rate)
+                    return
+                self._tokens -= 1
+            heapq.heappop(self._waiters)
+            self._active[priority] += 1
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+class _Slot:
+    def __init__(self, scheduler: LLMScheduler, priority: Priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    async def __aenter__(self):
+        await self.scheduler.acquire(self.priority)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.scheduler.release(self.priority)
@@ -0,0 +1,280 @@
+import asyncio
+from abc import ABC, abstractmethod
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Live objects that only make sense inside the worker that created them. They are
+# dropped on serialization; everything needed to continue the interview is plain data.
+RUNTIME_KEYS = {"channel", "fold_task", "report_tasks", "turns", "prefetch"}
+
+def serialize_session(data: dict) -> str:
+    return json.dumps({k: v for k, v in data.items() if k not in RUNTIME_KEYS})
+
+def deserialize_session(raw) -> dict:
+    # Runtime keys are left out entirely: this worker creates its own on demand
+    return json.loads(raw)
+
+def touch(data: dict) -> dict:
+    now = time.time()
+    data.setdefault("created_at", now)
+    data["last_active"] = now
+    return data
+
+def is_expired(data: dict, now: float, idle_ttl: float, absolute_ttl: float, ended_ttl: float) -> bool:
+    if now - data.get("last_active", now) > idle_ttl:
+        return True
+    if now - data.get("created_at", now) > absolute_ttl:
+        return True
+    ended_at = data.get("ended_at")
+    return ended_at is not None and now - ended_at > ended_ttl
+
+class SessionStore(ABC):
+    """
+    Interface for interview session storage. Sessions are plain dicts holding the
+    resume text, analysis, topics, conversation, code submissions and model context.
+    Every save stamps created_at/last_active, which the reaper uses for TTLs, and
+    saving beyond max_sessions evicts the least recently active session.
+    """
+    max_sessions = None
+
+    @abstractmethod
+    async def get(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def save(self, session_id: str, data: dict):
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def ids(self) -> list[str]:
+        ...
+
+    @abstractmethod
+    async def reap(self, idle_ttl: float, absolute_ttl: float, ended_ttl: float) -> int:
+        """
+        Deletes expired sessions and returns how many were removed.
+        """
+
+    @abstractmethod
+    async def count(self) -> int:
+        """
+        Number of sessions held. Cheap enough to call on every metrics scrape.
+        """
+
+    @abstractmethod
+    async def stats(self) -> dict:
+        ...
+
+class InMemorySessionStore(SessionStore):
+    """
+    Default single-process store. Returns the live dict, so runtime objects (the
+    replay channel, background tasks) stay attached to the session.
+    """
+    def __init__(self, max_sessions: int = None):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # least recently used first
+        self.evictions = 0
+
+    async def get(self, session_id: str):
+        data = self._sessions.get(session_id)
+        if data is not None:
+            self._sessions.move_to_end(session_id)
+        return data
+
+    async def save(self, session_id: str, data: dict):
+        self._sessions[session_id] = touch(data)
+        self._sessions.move_to_end(session_id)
+        while self.max_sessions and len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def ids(self) -> list[str]:
+        return list(self._sessions)
+
+    async def reap(self, idle_ttl: float, absolute_ttl: float, ended_ttl: float) -> int:
+        now = time.time()
+        expired = [
+            session_id for session_id, data in self._sessions.items()
+            if is_expired(data, now, idle_ttl, absolute_ttl, ended_ttl)
+        ]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+    async def count(self) -> int:
+        return len(self._sessions)
+
+    async def stats(self) -> dict:
+        # Serialized size is a reasonable proxy for what each session pins in memory
+        approx_bytes = sum(len(serialize_session(data)) for data in self._sessions.values())
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "approx_bytes": approx_bytes,
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+        }
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Shares sessions between workers on one host (or survives restarts) via a SQLite file.
+    """
+    def __init__(self, path: str, max_sessions: int = None):
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, data TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL, ended_at REAL)"
+        )
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _execute_count(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    async def get(self, session_id: str):
+        rows = await asyncio.to_thread(self._execute, "SELECT data FROM sessions WHERE id = ?", (session_id,))
+        return deserialize_session(rows[0][0]) if rows else None
+
+    async def save(self, session_id: str, data: dict):
+        touch(data)
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO sessions (id, data, created_at, updated_at, ended_at) VALUES (?, ?, ?, ?, ?)",
+            (session_id, serialize_session(data), data["created_at"], data["last_active"], data.get("ended_at"))
+        )
+        if self.max_sessions:
+            self.evictions += await asyncio.to_thread(
+                self._execute_count,
+                "DELETE FROM sessions WHERE id IN "
+                "(SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    async def ids(self) -> list[str]:
+        rows = await asyncio.to_thread(self._execute, "SELECT id FROM sessions")
+        return [row[0] for row in rows]
+
+    async def reap(self, idle_ttl: float, absolute_ttl: float, ended_ttl: float) -> int:
+        now = time.time()
+        return await asyncio.to_thread(
+            self._execute_count,
+            "DELETE FROM sessions WHERE updated_at < ? OR created_at < ? OR ended_at < ?",
+            (now - idle_ttl, now - absolute_ttl, now - ended_ttl)
+        )
+
+    async def count(self) -> int:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*) FROM sessions")
+        return rows[0][0]
+
+    async def stats(self) -> dict:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions")
+        return {
+            "backend": "sqlite",
+            "sessions": rows[0][0],
+            "approx_bytes": rows[0][1],
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+        }
+
+class RedisSessionStore(SessionStore):
+    """
+    Shares sessions across hosts. Works with any Redis-protocol server (Redis, Valkey, KeyDB...).
+
+    Next to the session keys, sorted sets index the session ids by last_active,
+    created_at and ended_at, so counting and reaping are range queries on the
+    index instead of a scan of the keyspace.
+    """
+    def __init__(self, url: str, prefix: str = "interview:session:", idle_ttl: float = None):
+        # Optional dependency - only needed when SESSION_STORE_URL points at Redis
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        # Outside the session key pattern, so they never show up as sessions
+        self._index = {field: f"{prefix.rstrip(':')}-index:{field}" for field in ("last_active", "created_at", "ended_at")}
+        # Redis expires idle sessions by itself; the reaper only has to handle absolute/ended TTLs
+        self.idle_ttl = idle_ttl
+
+    async def get(self, session_id: str):
+        raw = await self._redis.get(self.prefix + session_id)
+        return deserialize_session(raw) if raw is not None else None
+
+    async def save(self, session_id: str, data: dict):
+        touch(data)
+        ttl = int(self.idle_ttl) if self.idle_ttl else None
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self.prefix + session_id, serialize_session(data), ex=ttl)
+            for field, index in self._index.items():
+                if data.get(field) is not None:
+                    pipe.zadd(index, {session_id: data[field]})
+            await pipe.execute()
+
+    async def delete(self, session_id: str):
+        await self._delete([session_id])
+
+    async def ids(self) -> list[str]:
+        members = await self._redis.zrangebyscore(self._index["last_active"], self._live_since(), "+inf")
+        return [member.decode() for member in members]
+
+    async def reap(self, idle_ttl: float, absolute_ttl: float, ended_ttl: float) -> int:
+        now = time.time()
+        expired = set()
+        for field, ttl in (("last_active", idle_ttl), ("created_at", absolute_ttl), ("ended_at", ended_ttl)):
+            members = await self._redis.zrangebyscore(self._index[field], "-inf", f"({now - ttl}")
+            expired.update(member.decode() for member in members)
+        if expired:
+            await self._delete(list(expired))
+        return len(expired)
+
+    async def count(self) -> int:
+        return await self._redis.zcount(self._index["last_active"], self._live_since(), "+inf")
+
+    async def stats(self) -> dict:
+        # Sessions are shared across workers here, so there is no per-worker cap or LRU
+        session_ids = await self.ids()
+        approx_bytes = 0
+        for session_id in session_ids:
+            approx_bytes += await self._redis.strlen(self.prefix + session_id)
+        return {"backend": "redis", "sessions": len(session_ids), "approx_bytes": approx_bytes}
+
+    def _live_since(self):
+        # Index entries older than the idle TTL belong to keys Redis has already expired
+        return time.time() - self.idle_ttl if self.idle_ttl else "-inf"
+
+    async def _delete(self, session_ids: list[str]):
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*(self.prefix + session_id for session_id in session_ids))
+            for index in self._index.values():
+                pipe.zrem(index, *session_ids)
+            await pipe.execute()
+
+def create_session_store(url: str, max_sessions: int = None, idle_ttl: float = None) -> SessionStore:
+    """
+    Builds a store from a URL: "memory", "sqlite:///path/to/sessions.db" or "redis://host:6379/0".
+    """
+    if not url or url == "memory":
+        return InMemorySessionStore(max_sessions=max_sessions)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):], max_sessions=max_sessions)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url, idle_ttl=idle_ttl)
+    raise ValueError(f"Unsupported SESSION_STORE_URL: {url}")
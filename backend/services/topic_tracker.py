@@ -0,0 +1,172 @@
+import re
+import time
+
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Words that say nothing about which topic is being discussed
+STOPWORDS = {
+    "and", "the", "for", "with", "using", "from", "into", "about", "your", "their", "its",
+    "experience", "skills", "knowledge", "understanding", "based", "work", "working", "general",
+}
+# Words that only identify a topic when it has nothing more specific (e.g. "Side projects")
+GENERIC_WORDS = {
+    "development", "design", "project", "projects", "team", "system", "systems", "management",
+    "engineering", "technical", "software", "application", "applications", "tools", "practices",
+}
+# Keywords are compared on their first letters so "collaborated" matches "Team collaboration"
+STEM_CHARS = 6
+
+def keyword_stems(text: str) -> set[str]:
+    words = re.findall(r"[a-z0-9][a-z0-9+#]*", text.lower())
+    return {word[:STEM_CHARS] for word in words if len(word) >= 3 or "+" in word or "#" in word}
+
+def topic_keywords(topic: str) -> list[str]:
+    words = [w for w in re.findall(r"[a-z0-9][a-z0-9+#]*", topic.lower()) if w not in STOPWORDS]
+    words = [w for w in words if len(w) >= 3 or "+" in w or "#" in w]
+    specific = [w for w in words if w not in GENERIC_WORDS]
+    return sorted({w[:STEM_CHARS] for w in (specific or words)})
+
+class TopicTracker:
+    """
+    Follows the interview plan from the resume analysis: which topic is being
+    discussed, how long it has taken, and which topics have come up at all.
+
+    The plan moves on once the candidate has answered max_turns questions on the
+    current topic or its share of the interview time has run out. Coverage is
+    matched per exchange against keywords from the topic names - no model call -
+    so it also notices topics the conversation reached out of order, and the plan
+    skips topics that were already discussed enough.
+
+    Like ConversationContext, all state is a plain dict stored with the session.
+    """
+    def __init__(self, state: dict, max_turns: int = 2):
+        self.state = state
+        self.max_turns = max_turns
+
+    @staticmethod
+    def new_state(interview_topics: list[dict], minutes_per_topic: int) -> dict:
+        ordered = sorted(interview_topics, key=lambda t: PRIORITY_ORDER.get(str(t.get("priority", "medium")).lower(), 1))
+        order = [t.get("topic", "Unknown") for t in ordered]  # high priority first, as the prompt asks
+        return {
+            "order": order,
+            "priority": {t.get("topic", "Unknown"): str(t.get("priority", "medium")).lower() for t in ordered},
+            "keywords": {topic: topic_keywords(topic) for topic in order},
+            "minutes_per_topic": minutes_per_topic,
+            "current": 0,
+            "turns": 0,  # answers given on the current topic
+            "started_at": time.time(),
+            "mentions": {topic: 0 for topic in order},  # exchanges that discussed each topic
+            "seconds_spent": {topic: 0.0 for topic in order},  # time as the planned topic
+            "covered": []  # in the order topics first came up
+        }
+
+    @property
+    def current_topic(self):
+        order = self.state["order"]
+        return order[self.state["current"]] if self.state["current"] < len(order) else None
+
+    @property
+    def next_topic(self):
+        index = self._next_index()
+        return self.state["order"][index] if index < len(self.state["order"]) else None
+
+    def topic_closing(self, now: float = None) -> bool:
+        """
+        True if the candidate's next answer closes the current topic.
+        """
+        if self.current_topic is None:
+            return False
+        return self.state["turns"] + 1 >= self.max_turns or self._elapsed(now) >= self.state["minutes_per_topic"] * 60
+
+    def record_answer(self, now: float = None) -> bool:
+        """
+        Counts an answer on the current topic. Returns True if it closed the topic.
+        """
+        closing = self.topic_closing(now)
+        self.state["turns"] += 1
+        if closing:
+            self.advance(now)
+        return closing
+
+    def record_exchange(self, *texts: str) -> list[str]:
+        """
+        Matches one exchange (candidate answer, interviewer reply) against the topic
+        keywords. Returns the topics it discussed.
+        """
+        stems = set().union(*(keyword_stems(text) for text in texts))
+        discussed = [
+            topic for topic in self.state["order"]
+            if self.state["keywords"].get(topic) and stems.intersection(self.state["keywords"][topic])
+        ]
+        for topic in discussed:
+            self.state["mentions"][topic] = self.state["mentions"].get(topic, 0) + 1
+            if topic not in self.state["covered"]:
+                self.state["covered"].append(topic)
+        return discussed
+
+    def advance(self, now: float = None):
+        now = now or time.time()
+        topic = self.current_topic
+        if topic is not None:
+            self.state["seconds_spent"][topic] = self.state["seconds_spent"].get(topic, 0.0) + now - self.state["started_at"]
+        self.state["current"] = self._next_index()
+        self.state["turns"] = 0
+        self.state["started_at"] = now
+
+    @property
+    def covered(self) -> list[str]:
+        return list(self.state["covered"])
+
+    @property
+    def remaining(self) -> list[str]:
+        return [topic for topic in self.state["order"] if topic not in self.state["covered"]]
+
+    def prompt_state(self, now: float = None) -> str:
+        """
+        A few lines for the interviewer prompt: what is done, what is on now and
+        how much of its time budget is used, what is still open.
+        """
+        if not self.state["order"]:
+            return ""
+        lines = [f"Covered: {', '.join(self.state['covered']) or '(none yet)'}"]
+        topic = self.current_topic
+        if topic is not None:
+            budget = self.state["minutes_per_topic"]
+            line = (f"Now: {topic} ({self._elapsed(now) / 60:.1f} of {budget} min, "
+                    f"answer {self.state['turns'] + 1} of {self.max_turns})")
+            if self.topic_closing(now):
+                line += " - wrap this topic up after this answer"
+            lines.append(line)
+        remaining = [t for t in self.remaining if t != topic]
+        if remaining:
+            lines.append("Still open: " + ", ".join(f"{t} [{self.state['priority'].get(t, 'medium').upper()}]" for t in remaining))
+        return "\n".join(lines)
+
+    def coverage(self, now: float = None) -> list[dict]:
+        """
+        Per planned topic: whether it came up, in how many exchanges, and minutes spent on it as the planned topic.
+        """
+        seconds = dict(self.state["seconds_spent"])
+        if self.current_topic is not None:
+            seconds[self.current_topic] = seconds.get(self.current_topic, 0.0) + self._elapsed(now)
+        return [
+            {
+                "topic": topic,
+                "priority": self.state["priority"].get(topic, "medium"),
+                "covered": topic in self.state["covered"],
+                "mentions": self.state["mentions"].get(topic, 0),
+                "minutes": round(seconds.get(topic, 0.0) / 60, 1),
+            }
+            for topic in self.state["order"]
+        ]
+
+    def _elapsed(self, now: float = None) -> float:
+        return (now or time.time()) - self.state["started_at"]
+
+    def _next_index(self) -> int:
+        # Topics the conversation already covered in depth out of order are skipped
+        index = self.state["current"] + 1
+        order = self.state["order"]
+        while index < len(order) and self.state["mentions"].get(order[index], 0) >= self.max_turns:
+            index += 1
+        return index
@@ -1,15 +1,79 @@
-import edge_tts
+import asyncio
+import hashlib
 import io
+import os
+import re
+import shutil
+import time
+from typing import NamedTuple
+from config import (
+    TTS_CACHE_MAX_BYTES, TTS_CACHE_DIR, TTS_BACKEND, FAKE_TTS_LATENCY_MS, FFMPEG_PATH,
+    TTS_TRANSCODE_MAX_FAILURES, TTS_TRANSCODE_COOLDOWN_SECONDS
+)
+from services.cache import LRUCache
+from services.fakes import FakeTTSBackend
+from services.metrics import metrics, SIZE_BUCKETS
 
-class TTSService:
-    def __init__(self, voice="en-US-JennyNeural"):
-        self.voice = voice
+class AudioFormat(NamedTuple):
+    codec: str  # "mp3" or "opus" (Opus in a WebM container)
+    bitrate_kbps: int
+    sample_rate: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.codec}-{self.bitrate_kbps}k-{self.sample_rate // 1000}khz"
+
+# What Edge TTS always produces; any other format is transcoded from it
+NATIVE_FORMAT = AudioFormat("mp3", 48, 24000)
+DEFAULT_BITRATES = {"mp3": 48, "opus": 24}
+SAMPLE_RATES = {
+    "mp3": (8000, 11025, 12000, 16000, 22050, 24000),
+    "opus": (8000, 12000, 16000, 24000),
+}
+WEBM_MAGIC = b"\x1a\x45\xdf\xa3"
+
+def detect_codec(audio: bytes) -> str:
+    # Transcoding can fail and fall back to MP3, so trust the bytes over the request
+    return "opus" if audio.startswith(WEBM_MAGIC) else "mp3"
 
-    async def generate_audio(self, text: str) -> bytes:
+class FFmpegTranscoder:
+    """
+    Re-encodes Edge TTS MP3 through an ffmpeg subprocess. Optional: when the
+    binary is missing, sessions are simply offered MP3.
+    """
+    def __init__(self, path: str = "ffmpeg", timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self.available = shutil.which(path) is not None
+
+    async def transcode(self, audio: bytes, audio_format: AudioFormat) -> bytes:
+        if audio_format.codec == "opus":
+            encoder = ["-c:a", "libopus", "-application", "voip", "-f", "webm"]
+        else:
+            encoder = ["-c:a", "libmp3lame", "-f", "mp3"]
+        process = await asyncio.create_subprocess_exec(
+            self.path, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+            "-ac", "1", "-ar", str(audio_format.sample_rate), "-b:a", f"{audio_format.bitrate_kbps}k",
+            *encoder, "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            output, errors = await asyncio.wait_for(process.communicate(audio), timeout=self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            process.kill()
+            raise
+        if process.returncode != 0 or not output:
+            raise RuntimeError(f"ffmpeg exited with {process.returncode}: {errors.decode(errors='replace')[-200:]}")
+        return output
+
+class EdgeTTSBackend:
+    async def synthesize(self, text: str, voice: str) -> bytes:
         """
         Generates audio bytes from text using Edge TTS.
         """
-        communicate = edge_tts.Communicate(text, self.voice)
+        # Imported on first use (it pulls in aiohttp) so the fake backend and startup skip it
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice)
         audio_stream = io.BytesIO()
         async for chunk in communicate.stream():
              if chunk["type"] == "audio":
@@ -18,4 +82,212 @@ class TTSService:
         audio_stream.seek(0)
         return audio_stream.read()
 
-tts_service = TTSService()
+class TTSService:
+    def __init__(self, backend=None, voice="en-US-JennyNeural", cache_max_bytes: int = 32 * 1024 * 1024, cache_dir: str = None,
+                 transcoder: FFmpegTranscoder = None, transcode_max_failures: int = 3,
+                 transcode_cooldown_seconds: float = 60.0):
+        self.backend = backend or EdgeTTSBackend()
+        self.voice = voice
+        self.transcoder = transcoder
+        # Synthesized audio keyed on (voice, text hash): memory LRU first, then optional disk tier
+        self.cache = LRUCache(max_entries=2048, max_bytes=cache_max_bytes)
+        self.cache_dir = cache_dir
+        self.disk_hits = 0
+        self.transcode_failures = 0
+        # A format that keeps failing to transcode is served as MP3 for a while instead
+        # of spawning ffmpeg for every clip; one failure (say a timeout under load) is not enough
+        self.transcode_max_failures = transcode_max_failures
+        self.transcode_cooldown_seconds = transcode_cooldown_seconds
+        self._failures_in_a_row = {}  # format -> consecutive transcode failures
+        self._paused_until = {}  # format -> time it may be transcoded again
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def negotiate_format(self, codec: str = None, bitrate_kbps: int = None, sample_rate: int = None) -> AudioFormat:
+        """
+        Picks the closest supported format to what the client asked for. Anything
+        other than the native MP3 needs ffmpeg; without it the answer is MP3.
+        """
+        if codec not in SAMPLE_RATES or not (self.transcoder and self.transcoder.available):
+            return NATIVE_FORMAT
+        bitrate_kbps = max(8, min(bitrate_kbps or DEFAULT_BITRATES[codec], NATIVE_FORMAT.bitrate_kbps))
+        rates = SAMPLE_RATES[codec]
+        # Highest supported rate at or below the request (never upsample past the source)
+        sample_rate = max([rate for rate in rates if rate <= (sample_rate or NATIVE_FORMAT.sample_rate)] or [rates[0]])
+        audio_format = AudioFormat(codec, bitrate_kbps, sample_rate)
+        return NATIVE_FORMAT if self._transcode_paused(audio_format) else audio_format
+
+    async def generate_audio(self, text: str, audio_format: AudioFormat = NATIVE_FORMAT) -> bytes:
+        """
+        Generates audio bytes from text with the configured backend, serving repeated phrases from cache.
+        """
+        if self._transcode_paused(audio_format):
+            audio_format = NATIVE_FORMAT
+        if audio_format == NATIVE_FORMAT:
+            return await self._native_audio(text)
+
+        key = self._cache_key(text, audio_format)
+        audio = self.cache.get(key)
+        if audio is not None:
+            metrics.inc("tts_cache_lookups_total", help="TTS cache lookups by result", result="hit")
+            return audio
+
+        source = await self._native_audio(text)
+        try:
+            with metrics.span("tts_transcode", format=audio_format.key):
+                audio = await self.transcoder.transcode(source, audio_format)
+        except Exception as e:
+            print(f"Warning: TTS transcode to {audio_format.key} failed, sending MP3: {e}")
+            self.transcode_failures += 1
+            failures = self._failures_in_a_row[audio_format] = self._failures_in_a_row.get(audio_format, 0) + 1
+            if failures >= self.transcode_max_failures:
+                self._paused_until[audio_format] = time.monotonic() + self.transcode_cooldown_seconds
+            return source
+        self._failures_in_a_row.pop(audio_format, None)
+        self.cache.set(key, audio)
+        metrics.observe("tts_audio_bytes", len(audio), help="Size of each synthesized audio clip",
+                        buckets=SIZE_BUCKETS, format=audio_format.key)
+        return audio
+
+    async def prewarm(self, texts: list[str]):
+        """
+        Synthesizes fixed phrases (e.g. persona greetings) ahead of time so the
+        first audio of a session is served straight from cache.
+        """
+        for text in texts:
+            try:
+                await self.generate_audio(text)
+            except Exception as e:
+                print(f"Warning: TTS prewarm failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "disk_hits": self.disk_hits,
+            "disk_enabled": bool(self.cache_dir),
+            "transcoding": bool(self.transcoder and self.transcoder.available),
+            "transcode_failures": self.transcode_failures,
+            "transcode_paused": {
+                audio_format.key: round(until - time.monotonic(), 1)
+                for audio_format, until in self._paused_until.items() if until > time.monotonic()
+            },  # format -> seconds until it is tried again
+        }
+
+    def _transcode_paused(self, audio_format: AudioFormat) -> bool:
+        return audio_format != NATIVE_FORMAT and self._paused_until.get(audio_format, 0) > time.monotonic()
+
+    async def _native_audio(self, text: str) -> bytes:
+        # MP3 from the memory cache, the disk cache or the backend
+        key = self._cache_key(text)
+        audio = self.cache.get(key)
+        if audio is not None:
+            metrics.inc("tts_cache_lookups_total", help="TTS cache lookups by result", result="hit")
+            return audio
+        audio = await self._read_disk(key)
+        if audio is not None:
+            self.disk_hits += 1
+            metrics.inc("tts_cache_lookups_total", help="TTS cache lookups by result", result="disk_hit")
+        else:
+            metrics.inc("tts_cache_lookups_total", help="TTS cache lookups by result", result="miss")
+            with metrics.span("tts_synthesize", chars=len(text)):
+                audio = await self._synthesize(text)
+            if audio:
+                metrics.observe("tts_audio_bytes", len(audio), help="Size of each synthesized audio clip",
+                                buckets=SIZE_BUCKETS, format=NATIVE_FORMAT.key)
+                await self._write_disk(key, audio)
+        if audio:
+            self.cache.set(key, audio)
+        return audio
+
+    async def _synthesize(self, text: str) -> bytes:
+        return await self.backend.synthesize(text, self.voice)
+
+    def _cache_key(self, text: str, audio_format: AudioFormat = NATIVE_FORMAT) -> str:
+        digest = hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+        if audio_format == NATIVE_FORMAT:
+            return f"{self.voice}-{digest}"  # same key as before formats existed, so disk caches stay valid
+        return f"{self.voice}-{audio_format.key}-{digest}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    async def _read_disk(self, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            return await asyncio.to_thread(_read_file, path)
+        except FileNotFoundError:
+            return None
+
+    async def _write_disk(self, key: str, audio: bytes):
+        if not self.cache_dir:
+            return
+        try:
+            await asyncio.to_thread(_write_file, self._disk_path(key), audio)
+        except OSError as e:
+            print(f"Warning: could not write TTS cache file: {e}")
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_file(path: str, data: bytes):
+    # Write to a temp file first so concurrent readers never see a partial MP3
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class SentenceBuffer:
+    """
+    Collects streamed LLM text and releases it one speakable sentence at a time.
+    Very short sentences ("Great.") are merged with the next one so each TTS
+    request carries enough text to be worth the round-trip.
+    """
+    boundary = re.compile(r'(?<=[.!?])\s+|\n+')
+    speakable = re.compile(r'\w')
+
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+        self._buffer = ""
+        self._pending = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer += text
+        *complete, self._buffer = self.boundary.split(self._buffer)
+        return self._merge(complete)
+
+    def flush(self) -> list[str]:
+        sentences = self._merge([self._buffer])
+        self._buffer = ""
+        if self._pending:
+            sentences.append(self._pending)
+            self._pending = ""
+        return sentences
+
+    def _merge(self, pieces: list[str]) -> list[str]:
+        sentences = []
+        for piece in pieces:
+            piece = piece.strip()
+            if not piece or not self.speakable.search(piece):
+                continue
+            self._pending = f"{self._pending} {piece}".strip()
+            if len(self._pending) >= self.min_length:
+                sentences.append(self._pending)
+                self._pending = ""
+        return sentences
+
+def create_tts_backend(name: str):
+    if name == "fake":
+        return FakeTTSBackend(latency=FAKE_TTS_LATENCY_MS / 1000)
+    return EdgeTTSBackend()
+
+tts_service = TTSService(
+    backend=create_tts_backend(TTS_BACKEND),
+    cache_max_bytes=TTS_CACHE_MAX_BYTES,
+    cache_dir=TTS_CACHE_DIR,
+    transcoder=FFmpegTranscoder(FFMPEG_PATH),
+    transcode_max_failures=TTS_TRANSCODE_MAX_FAILURES,
+    transcode_cooldown_seconds=TTS_TRANSCODE_COOLDOWN_SECONDS
+)
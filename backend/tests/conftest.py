@@ -0,0 +1,53 @@
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "tools"))
+
+# Deterministic local stand-ins for Gemini and Edge TTS, as fast as they go
+FAKE_ENV = {
+    "LLM_BACKEND": "fake",
+    "TTS_BACKEND": "fake",
+    "FAKE_LLM_LATENCY_MS": "0",
+    "FAKE_LLM_TOKENS_PER_SECOND": "100000",
+    "FAKE_TTS_LATENCY_MS": "0",
+    "LLM_RATE_PER_MINUTE": "100000",
+    "LLM_BURST": "1000",
+    "TURN_COALESCE_MS": "20",
+    "PERSISTENCE_URL": "none",
+}
+
+def _forget_app_modules():
+    # config and the service singletons read the environment at import time
+    for name in list(sys.modules):
+        if name in ("main", "config") or name.startswith(("services", "managers")):
+            del sys.modules[name]
+
+@pytest.fixture
+def load_app(monkeypatch):
+    """
+    Imports main afresh with the fake backends plus the given settings and returns the module.
+    """
+    def load(**settings):
+        for key, value in {**FAKE_ENV, **settings}.items():
+            monkeypatch.setenv(key, str(value))
+        _forget_app_modules()
+        return importlib.import_module("main")
+    yield load
+    _forget_app_modules()
+
+def receive_reply(ws) -> str:
+    """
+    Reads messages until the interviewer's complete reply text (audio frames are skipped).
+    """
+    while True:
+        message = ws.receive()
+        if message.get("text"):
+            data = json.loads(message["text"])
+            if data.get("type") == "text":
+                return data["content"]
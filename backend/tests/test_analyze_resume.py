@@ -0,0 +1,34 @@
+"""
+/analyze-resume: the analysis cache and concurrent uploads of the same PDF.
+"""
+import asyncio
+
+import httpx
+
+from loadtest import make_resume_pdf
+from services import prompts
+
+def test_concurrent_uploads_of_one_pdf_share_the_analysis(load_app):
+    main = load_app(FAKE_LLM_LATENCY_MS="100")
+    validations = []
+    generate = main.llm.generate
+
+    async def spy(prompt, *args, **kwargs):
+        if isinstance(prompt, str) and prompts.VALIDATION_TASK in prompt:
+            validations.append(prompt)
+        return await generate(prompt, *args, **kwargs)
+    main.llm.generate = spy
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def upload():
+                files = {"file": ("resume.pdf", make_resume_pdf(candidate=7), "application/pdf")}
+                return (await client.post("/analyze-resume", files=files)).json()
+            return await asyncio.gather(upload(), upload())
+
+    first, second = asyncio.run(scenario())
+    assert len(validations) == 1
+    assert first["analysis"] == second["analysis"]
+    assert first["session_id"] != second["session_id"]  # each upload still gets its own interview
+    assert main.analyses_in_flight == {}
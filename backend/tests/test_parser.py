@@ -0,0 +1,26 @@
+"""
+PDF parsing in the worker pool.
+"""
+import asyncio
+
+from loadtest import make_resume_pdf
+
+def test_parse_recovers_from_a_dead_worker(load_app):
+    load_app()
+    from services.parser import ResumeParser
+
+    async def scenario():
+        parser = ResumeParser(max_bytes=1024 * 1024, max_pages=5, max_chars=20000, timeout=30, workers=1)
+        pdf = make_resume_pdf()
+        try:
+            assert await parser.parse(pdf)
+            broken = parser._pool
+            for process in list(broken._processes.values()):
+                process.kill()
+                process.join()
+            assert await parser.parse(pdf)
+            assert parser._pool is not broken
+        finally:
+            parser._pool.shutdown(wait=True)
+
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+"""
+Archiving finished interviews behind the report request.
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import receive_reply
+from loadtest import ANSWERS, make_resume_pdf
+
+def test_report_without_summary_keeps_the_assessed_sections(load_app, tmp_path):
+    archive = tmp_path / "interviews.jsonl"
+    main = load_app(PERSISTENCE_URL=f"jsonl://{archive}")
+
+    async def failing_stream(prompt, *args, **kwargs):
+        yield "# INTERVIEW REPORT CARD\n"
+        raise RuntimeError("model went away")
+
+    with TestClient(main.app) as client:
+        upload = client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+        session_id = upload.json()["session_id"]
+        with client.websocket_connect(f"/ws/interview/{session_id}?stream=false") as ws:
+            ws.receive_text()  # session
+            receive_reply(ws)  # greeting
+            ws.send_text(json.dumps({"type": "transcript", "content": ANSWERS[0]}))
+            receive_reply(ws)
+
+        main.llm.stream = failing_stream
+        response = client.post(f"/end-interview/{session_id}")
+        assert response.status_code == 200
+        report = response.json()["report"]
+        assert report.startswith("# INTERVIEW REPORT CARD\n")
+        assert main.SUMMARY_UNAVAILABLE in report
+        assert "### Topics Actually Covered" in report
+    # Shutdown flushes the queue
+
+    records = [json.loads(line) for line in archive.read_text().splitlines()]
+    assert [record["id"] for record in records] == [session_id]
+    assert records[0]["report"] == report
+    assert ANSWERS[0] in records[0]["transcript"]
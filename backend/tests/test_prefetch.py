@@ -0,0 +1,67 @@
+"""
+Prefetched next-topic questions: only served when they are ready and fit the turn.
+"""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import receive_reply
+from loadtest import ANSWERS, make_resume_pdf
+
+class SlowLLM:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def generate(self, contents, priority=None):
+        await asyncio.sleep(self.delay)
+        return "Let's talk about databases."
+
+class FakeTTS:
+    async def generate_audio(self, text, audio_format=None):
+        return b"ID3audio"
+
+def test_unfinished_prefetch_is_not_awaited(load_app):
+    load_app()
+    from services.prefetch import QuestionPrefetcher
+
+    async def scenario():
+        session = {}
+        prefetcher = QuestionPrefetcher(SlowLLM(delay=10), FakeTTS())
+        prefetcher.start(session, "Databases", [], None)
+        task = session["prefetch"]["task"]
+        assert prefetcher.take(session, "Databases") is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+        prefetcher = QuestionPrefetcher(SlowLLM(delay=0), FakeTTS())
+        prefetcher.start(session, "Databases", [], None)
+        await session["prefetch"]["task"]
+        assert prefetcher.take(session, "Databases")["text"] == "Let's talk about databases."
+
+    asyncio.run(scenario())
+
+def test_code_submission_is_reviewed_on_a_topic_closing_turn(load_app):
+    main = load_app(TOPIC_MAX_TURNS="2")
+    prompts = []
+    generate = main.llm.generate
+
+    async def spy(contents, *args, **kwargs):
+        prompts.append(contents[-1]["parts"][0] if isinstance(contents, list) else contents)
+        return await generate(contents, *args, **kwargs)
+    main.llm.generate = spy
+
+    with TestClient(main.app) as client:
+        upload = client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+        session_id = upload.json()["session_id"]
+        with client.websocket_connect(f"/ws/interview/{session_id}?stream=false") as ws:
+            ws.receive_text()  # session
+            receive_reply(ws)  # greeting
+            ws.send_text(json.dumps({"type": "transcript", "content": ANSWERS[0]}))
+            receive_reply(ws)
+            # The next answer closes the topic, so a next-topic question is being prepared
+            assert "prefetch" in main.session_store._sessions[session_id]
+            ws.send_text(json.dumps({"type": "code_submission", "code": "print(1)", "language": "python"}))
+            receive_reply(ws)
+
+    assert any("submitted their code solution" in prompt for prompt in prompts)
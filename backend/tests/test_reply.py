@@ -0,0 +1,39 @@
+"""
+How an interviewer turn fails: model errors get an apology, audio errors only lose audio.
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import receive_reply
+from loadtest import ANSWERS, make_resume_pdf
+
+def start_interview(client, query: str = "stream=false"):
+    upload = client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+    session_id = upload.json()["session_id"]
+    ws = client.websocket_connect(f"/ws/interview/{session_id}?{query}")
+    return session_id, ws
+
+def test_tts_failure_keeps_the_reply(load_app):
+    main = load_app(QUESTION_PREFETCH="false")
+    with TestClient(main.app) as client:
+        session_id, connection = start_interview(client)
+        with connection as ws:
+            ws.receive_text()  # session
+            receive_reply(ws)  # greeting
+
+            async def broken_tts(*args, **kwargs):
+                raise RuntimeError("TTS is down")
+            main.tts_service.generate_audio = broken_tts
+
+            ws.send_text(json.dumps({"type": "transcript", "content": ANSWERS[0]}))
+            reply = receive_reply(ws)
+            assert reply != main.FALLBACK_REPLY
+            # The next turn is answered normally, so the first one has been recorded
+            ws.send_text(json.dumps({"type": "transcript", "content": ANSWERS[1]}))
+            receive_reply(ws)
+
+        session = main.session_store._sessions[session_id]
+        assert f"AI: {reply}" in session["conversation"]
+        assert main.FALLBACK_REPLY not in "\n".join(session["conversation"])
+        assert [reply] == [model_text for _, model_text in session["context"]["recent"]][:1]
@@ -0,0 +1,79 @@
+"""
+LLMScheduler: priority order, reserved interactive slots and the token bucket.
+"""
+import asyncio
+
+def test_interactive_call_goes_ahead_of_queued_background_work(load_app):
+    load_app()
+    from services.scheduler import LLMScheduler, Priority
+
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, rate_per_minute=60000, burst=100, reserved_interactive=0)
+        await scheduler.acquire(Priority.BACKGROUND)
+        granted = []
+
+        async def call(priority: Priority):
+            await scheduler.acquire(priority)
+            granted.append(priority)
+
+        waiting = [asyncio.create_task(call(Priority.BACKGROUND)), asyncio.create_task(call(Priority.ANALYSIS))]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(call(Priority.INTERACTIVE)))  # queued last
+        await asyncio.sleep(0)
+        assert granted == []
+        for _ in range(3):
+            scheduler.release(Priority.BACKGROUND if not granted else granted[-1])
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiting)
+        return granted
+
+    assert asyncio.run(scenario()) == [Priority.INTERACTIVE, Priority.ANALYSIS, Priority.BACKGROUND]
+
+def test_background_work_never_takes_the_reserved_slots(load_app):
+    load_app()
+    from services.scheduler import LLMScheduler, Priority
+
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=3, rate_per_minute=60000, burst=100, reserved_interactive=2)
+        await scheduler.acquire(Priority.BACKGROUND)
+        queued = asyncio.create_task(scheduler.acquire(Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        assert not queued.done()  # the other two slots are kept for live turns
+        await asyncio.wait_for(scheduler.acquire(Priority.INTERACTIVE), timeout=1)
+        await asyncio.wait_for(scheduler.acquire(Priority.INTERACTIVE), timeout=1)
+
+        scheduler.release(Priority.INTERACTIVE)
+        await asyncio.sleep(0)
+        assert not queued.done()  # a free reserved slot is still not for background work
+        scheduler.release(Priority.BACKGROUND)
+        await asyncio.wait_for(queued, timeout=1)
+        assert scheduler.stats()["active"] == {"interactive": 1, "analysis": 0, "background": 1}
+
+    asyncio.run(scenario())
+
+def test_call_held_back_by_the_token_bucket_is_woken_up(load_app):
+    load_app()
+    from services.scheduler import LLMScheduler, Priority
+
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=4, rate_per_minute=1200, burst=1)  # a token every 50ms
+        await scheduler.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        # No release happens: only the scheduled wakeup can grant it
+        await asyncio.wait_for(waiter, timeout=1)
+
+    asyncio.run(scenario())
+
+def test_zero_rate_turns_the_token_bucket_off(load_app):
+    load_app()
+    from services.scheduler import LLMScheduler, Priority
+
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=8, rate_per_minute=0, burst=1)
+        for _ in range(3):
+            await asyncio.wait_for(scheduler.acquire(Priority.ANALYSIS), timeout=1)
+        return scheduler.stats()["active"]["analysis"]
+
+    assert asyncio.run(scenario()) == 3
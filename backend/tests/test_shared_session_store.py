@@ -0,0 +1,98 @@
+"""
+End-to-end interview flow on the SQLite session store, with the fake LLM and TTS.
+
+Sessions loaded from a shared store come back without the worker-local runtime
+objects (channel, background tasks), so every path that uses them has to cope.
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import receive_reply
+from loadtest import ANSWERS, make_resume_pdf
+
+def wait_for_saved_turns(store, session_id: str, turns: int, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        stored = asyncio.run(store.get(session_id))
+        if stored["context"]["turns"] >= turns or time.monotonic() > deadline:
+            return stored
+        time.sleep(0.05)
+
+def test_interview_flow_on_sqlite_store(load_app, tmp_path):
+    main = load_app(SESSION_STORE_URL=f"sqlite:///{tmp_path / 'sessions.db'}")
+    turns = 3
+    with TestClient(main.app) as client:
+        upload = client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+        session_id = upload.json()["session_id"]
+
+        with client.websocket_connect(f"/ws/interview/{session_id}?stream=false") as ws:
+            assert json.loads(ws.receive_text())["type"] == "session"
+            receive_reply(ws)  # greeting
+            for answer in ANSWERS[:turns]:
+                ws.send_text(json.dumps({"type": "transcript", "content": answer}))
+                assert receive_reply(ws)
+
+        # The last turn is saved just after its reply is sent
+        stored = wait_for_saved_turns(main.session_store, session_id, turns)
+        assert stored["context"]["turns"] == turns
+        assert sum(line.startswith("AI: ") for line in stored["conversation"]) == turns
+
+        response = client.post(f"/end-interview/{session_id}")
+        assert response.status_code == 200
+        assert "INTERVIEW REPORT CARD" in response.json()["report"]
+
+def test_metrics_count_sessions_without_sizing_them(load_app, tmp_path):
+    main = load_app(SESSION_STORE_URL=f"sqlite:///{tmp_path / 'sessions.db'}")
+
+    async def no_stats():
+        raise AssertionError("/metrics must not size every session")
+
+    with TestClient(main.app) as client:
+        for _ in range(2):
+            client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+        assert asyncio.run(main.session_store.count()) == client.get("/sessions/stats").json()["sessions"] == 2
+        main.session_store.stats = no_stats
+        assert "interview_sessions 2" in client.get("/metrics").text
+        assert client.get("/ready").status_code == 200
+
+def test_incomplete_store_cannot_be_created(load_app):
+    load_app()
+    from services.session_store import InMemorySessionStore, SessionStore
+
+    class NoStats(InMemorySessionStore):
+        stats = SessionStore.stats
+
+    with pytest.raises(TypeError, match="stats"):
+        NoStats()
+
+def test_reconnect_replays_a_reply_made_while_away(load_app, tmp_path):
+    main = load_app(SESSION_STORE_URL=f"sqlite:///{tmp_path / 'sessions.db'}", FAKE_LLM_LATENCY_MS="200")
+    with TestClient(main.app) as client:
+        upload = client.post("/analyze-resume", files={"file": ("resume.pdf", make_resume_pdf(), "application/pdf")})
+        session_id = upload.json()["session_id"]
+
+        with client.websocket_connect(f"/ws/interview/{session_id}?stream=false") as ws:
+            resume_token = json.loads(ws.receive_text())["resume_token"]
+            receive_reply(ws)  # greeting text (seq 1)
+            ws.receive_bytes()  # greeting audio (seq 2)
+            ws.send_text(json.dumps({"type": "transcript", "content": ANSWERS[0]}))
+            # Leaving cancels the handler, so make sure it has read the answer first
+            ws.send_text(json.dumps({"type": "ping"}))
+            assert json.loads(ws.receive_text())["type"] == "pong"
+        # The reply is written while the candidate is away
+        stored = wait_for_saved_turns(main.session_store, session_id, 1)
+
+        with client.websocket_connect(f"/ws/interview/{session_id}?stream=false&resume_token={resume_token}&last_seq=2") as ws:
+            assert json.loads(ws.receive_text())["resumed"] is True
+            # Everything replayed arrives before the answer to this ping
+            ws.send_text(json.dumps({"type": "ping"}))
+            replayed = []
+            while not replayed or replayed[-1]["type"] != "pong":
+                message = ws.receive()
+                if message.get("text"):
+                    replayed.append(json.loads(message["text"]))
+            assert [m["content"] for m in replayed if m["type"] == "text"] == [stored["conversation"][-1][len("AI: "):]]
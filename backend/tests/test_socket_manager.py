@@ -0,0 +1,172 @@
+"""
+Per-socket send queues (shedding for slow clients) and admission control.
+"""
+import asyncio
+import json
+
+import pytest
+
+class FakeSocket:
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.gone = False  # sends fail once the client has left
+        self.gate = asyncio.Event()  # a blocked socket is a client that stopped reading
+        if not blocked:
+            self.gate.set()
+
+    async def send_text(self, data: str):
+        await self.gate.wait()
+        if self.gone:
+            raise ConnectionError("client left")
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes):
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+def delta(message_id: int, content: str) -> str:
+    return json.dumps({"type": "text_delta", "content": content, "id": message_id})
+
+def test_slow_client_gets_merged_deltas_and_only_current_audio(load_app):
+    load_app()
+    from managers.socket_manager import SendQueue
+
+    async def scenario():
+        socket = FakeSocket(blocked=True)
+        outbox = SendQueue(socket, max_messages=4, max_bytes=1024 * 1024)
+        # Nothing below yields to the loop, so the writer cannot drain the queue in between
+        await outbox.send_text(delta(1, "Hel"), 1, kind="delta")
+        await outbox.send_text(delta(1, "lo"), 1, kind="delta")
+        await outbox.send_bytes(b"audio-1", 1)
+        await outbox.send_text(json.dumps({"type": "text", "content": "Hello", "id": 1}), 1)
+        await outbox.send_text(json.dumps({"type": "pong"}), kind="pong")
+        await outbox.send_text(json.dumps({"type": "pong"}), kind="pong")
+        await outbox.send_text(delta(2, "Next"), 2, kind="delta")
+        assert len(outbox._queue) <= 4
+
+        socket.gate.set()
+        await asyncio.sleep(0.01)
+        outbox.close()
+        return socket.sent
+
+    sent = asyncio.run(scenario())
+    assert [json.loads(item) for item in sent] == [
+        {"type": "text_delta", "content": "Hello", "id": 1},  # merged in place of the last delta
+        {"type": "text", "content": "Hello", "id": 1},  # complete texts are never dropped
+        {"type": "pong"},  # only the newest pong
+        {"type": "text_delta", "content": "Next", "id": 2},
+    ]  # audio of message 1 was dropped once message 2 was queued
+
+def test_client_still_too_far_behind_is_closed(load_app):
+    load_app()
+    from managers.socket_manager import TRY_AGAIN_LATER, SendQueue
+
+    async def scenario():
+        socket = FakeSocket(blocked=True)
+        outbox = SendQueue(socket, max_messages=2, max_bytes=1024 * 1024)
+        for i in range(4):  # nothing here can be shed
+            await outbox.send_text(json.dumps({"type": "text", "content": str(i)}), i)
+        with pytest.raises(ConnectionError):
+            await outbox.send_text(json.dumps({"type": "text", "content": "4"}), 4)
+        with pytest.raises(ConnectionError):
+            await outbox.send_text(json.dumps({"type": "text", "content": "5"}), 5)
+        await asyncio.sleep(0)
+        return socket.closed_with
+
+    assert asyncio.run(scenario()) == TRY_AGAIN_LATER
+
+async def wait_until(condition, timeout: float = 1.0):
+    for _ in range(int(timeout / 0.005)):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+def messages(socket: FakeSocket) -> list[dict]:
+    return [json.loads(item) for item in socket.sent]
+
+def test_full_worker_queues_then_hands_the_slot_on(load_app):
+    load_app()
+    from managers.socket_manager import TRY_AGAIN_LATER, ConnectionManager
+
+    async def scenario():
+        manager = ConnectionManager(max_active=1, max_waiting=1, update_seconds=60)
+        first = await manager.connect("a", FakeSocket())
+        waiter_socket = FakeSocket()
+        waiter = asyncio.create_task(manager.connect("b", waiter_socket))
+        await wait_until(lambda: waiter_socket.sent)
+        assert messages(waiter_socket)[0]["type"] == "queued"
+        assert messages(waiter_socket)[0]["position"] == 1
+
+        # Line is full: turned away with an estimate
+        rejected_socket = FakeSocket()
+        assert await manager.connect("c", rejected_socket) is None
+        assert messages(rejected_socket)[0]["type"] == "busy"
+        assert rejected_socket.closed_with == TRY_AGAIN_LATER
+
+        manager.disconnect("a", first)
+        assert manager.active == {"b": None}  # reserved until the waiter registers
+        outbox = await waiter
+        assert manager.active == {"b": outbox}
+        assert manager.stats()["waiting"] == 0
+        manager.disconnect("b", outbox)
+
+    asyncio.run(scenario())
+
+def test_waiter_that_leaves_as_its_slot_opens_passes_it_on(load_app):
+    load_app()
+    from managers.socket_manager import ConnectionManager
+
+    async def scenario():
+        manager = ConnectionManager(max_active=1, max_waiting=2, update_seconds=0.02)
+        first = await manager.connect("a", FakeSocket())
+        leaving_socket, next_socket = FakeSocket(), FakeSocket()
+        leaving = asyncio.create_task(manager.connect("b", leaving_socket))
+        await wait_until(lambda: leaving_socket.sent)
+        admitted = asyncio.create_task(manager.connect("c", next_socket))
+        await wait_until(lambda: next_socket.sent)
+
+        leaving_socket.gate.clear()  # "b" gets stuck sending its next position update
+        await asyncio.sleep(0.05)
+        manager.disconnect("a", first)  # the slot goes to "b"...
+        assert manager.active == {"b": None}
+        leaving_socket.gone = True  # ...which has left by the time the update fails
+        leaving_socket.gate.set()
+        assert await leaving is None
+        outbox = await asyncio.wait_for(admitted, timeout=1)
+        assert manager.active == {"c": outbox}
+        manager.disconnect("c", outbox)
+
+    asyncio.run(scenario())
+
+def test_same_session_replaces_its_waiting_socket(load_app):
+    load_app()
+    from managers.socket_manager import ConnectionManager
+
+    async def scenario():
+        manager = ConnectionManager(max_active=1, max_waiting=1, update_seconds=60)
+        first = await manager.connect("a", FakeSocket())
+        old_socket, new_socket = FakeSocket(), FakeSocket()
+        old = asyncio.create_task(manager.connect("b", old_socket))
+        await wait_until(lambda: old_socket.sent)
+        new = asyncio.create_task(manager.connect("b", new_socket))
+        assert await old is None  # gives up its place to the reconnect
+        await wait_until(lambda: new_socket.sent)
+        assert list(manager.waiting) == ["b"]
+
+        manager.disconnect("a", first)
+        outbox = await new
+        assert manager.active == {"b": outbox}
+
+        # A reconnect of an admitted session takes over its slot without queueing
+        replacement = await manager.connect("b", FakeSocket())
+        assert outbox.closed and manager.active == {"b": replacement}
+        manager.disconnect("b", outbox)  # the stale handler leaves the new socket's slot alone
+        assert manager.active == {"b": replacement}
+        manager.disconnect("b", replacement)
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+"""
+TTS formats: transcoding from the native MP3, and what is counted as sent.
+"""
+import asyncio
+
+class StubTranscoder:
+    available = True
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.calls = 0
+
+    async def transcode(self, audio: bytes, audio_format) -> bytes:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("ffmpeg exited with 1")
+        return b"OggS" + audio[:10]
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_bytes(self, payload: bytes, message_id: int = 0, audio: bool = True):
+        self.sent.append(payload)
+
+def sent_bytes(metrics) -> dict:
+    return {dict(labels)["codec"]: value for (name, labels), value in metrics.counters.items()
+            if name == "tts_audio_sent_bytes_total"}
+
+def test_only_audio_delivered_to_a_client_counts_as_sent(load_app):
+    load_app()
+    from managers.framing import Codec
+    from managers.session_channel import SessionChannel
+    from services.fakes import FakeTTSBackend
+    from services.metrics import metrics
+    from services.tts import TTSService
+
+    service = TTSService(backend=FakeTTSBackend(latency=0), transcoder=StubTranscoder(fail=False))
+
+    async def scenario():
+        await service.prewarm(["Hi, I'm your interviewer today."])  # no session is connected
+        channel = SessionChannel()
+        channel.attach(RecordingSocket())
+        first = channel.begin_message()
+        audio = await service.generate_audio("Tell me about your last project.", service.negotiate_format("opus"))
+        await channel.send_audio(audio, first, Codec.OPUS_WEBM)
+        second = channel.begin_message()
+        channel.cancel(second)  # barge-in before the clip was sent
+        await channel.send_audio(await service.generate_audio("And the database?"), second)
+        return audio
+
+    audio = asyncio.run(scenario())
+    assert sent_bytes(metrics) == {"opus_webm": len(audio)}
+
+def test_transcode_pauses_after_repeated_failures(load_app):
+    load_app()
+    from services.fakes import FakeTTSBackend
+    from services.tts import NATIVE_FORMAT, TTSService
+
+    transcoder = StubTranscoder(fail=True)
+    service = TTSService(backend=FakeTTSBackend(latency=0), transcoder=transcoder,
+                         transcode_max_failures=2, transcode_cooldown_seconds=60)
+    opus = service.negotiate_format("opus")
+
+    async def speak(*texts):
+        return [await service.generate_audio(text, opus) for text in texts]
+
+    clips = asyncio.run(speak("First question?"))
+    # One failure (a timeout under load, say) does not give up on the format
+    assert service.negotiate_format("opus") == opus
+    clips += asyncio.run(speak("Second question?", "Third question?", "Fourth question?"))
+    assert transcoder.calls == 2
+    assert not any(clip.startswith(b"OggS") for clip in clips)  # sent as MP3
+    assert service.negotiate_format("opus") == NATIVE_FORMAT
+    assert 0 < service.stats()["transcode_paused"][opus.key] <= 60
+
+    # After the cooldown the format is tried again
+    transcoder.fail = False
+    service._paused_until[opus] = 0
+    assert service.negotiate_format("opus") == opus
+    assert asyncio.run(speak("Fifth question?"))[0].startswith(b"OggS")
+    assert service.stats()["transcode_paused"] == {}
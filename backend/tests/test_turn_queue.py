@@ -0,0 +1,48 @@
+"""
+TurnQueue: coalescing candidate input into interviewer turns.
+"""
+import asyncio
+
+def test_close_during_coalescing_still_answers_and_exits(load_app):
+    load_app()
+    from managers.turn_queue import TurnQueue
+
+    async def scenario():
+        answered = []
+
+        async def respond(items, commit):
+            commit()
+            answered.append([item["content"] for item in items])
+
+        turns = TurnQueue(respond, coalesce_seconds=0.2)
+        turns.start()
+        turns.put({"type": "transcript", "content": "first"})
+        await asyncio.sleep(0.05)  # inside the coalescing wait
+        turns.close()
+        await asyncio.wait_for(turns._runner, timeout=2)
+        assert answered == [["first"]]
+
+    asyncio.run(scenario())
+
+def test_failed_turn_is_counted_as_failed(load_app):
+    load_app()
+    from managers.turn_queue import TurnQueue
+    from services.metrics import metrics
+
+    async def scenario():
+        async def respond(items, commit):
+            if items[0]["content"] == "boom":
+                raise RuntimeError("model went away")
+
+        turns = TurnQueue(respond, coalesce_seconds=0)
+        turns.start()
+        turns.put({"type": "transcript", "content": "boom"})
+        await asyncio.sleep(0.02)
+        turns.put({"type": "transcript", "content": "fine"})
+        turns.close()
+        await asyncio.wait_for(turns._runner, timeout=2)
+
+    asyncio.run(scenario())
+    outcomes = {dict(labels)["result"]: value for (name, labels), value in metrics.counters.items()
+                if name == "interview_turns_total"}
+    assert outcomes == {"failed": 1, "answered": 1}
@@ -0,0 +1,190 @@
+"""
+Load generator for the interview server.
+
+Drives N concurrent candidates through the full flow: upload a resume to
+/analyze-resume, open /ws/interview, then send transcript turns. Reports
+p50/p95/p99 for upload latency, time-to-first-text and time-to-first-audio per
+turn, plus overall turn throughput.
+
+Run the server against the local stand-ins so results measure this service and
+not Gemini or Edge TTS quotas:
+
+    LLM_BACKEND=fake TTS_BACKEND=fake LLM_RATE_PER_MINUTE=100000 LLM_BURST=1000 \
+        uvicorn main:app --workers 1 --port 8000
+    python tools/loadtest.py --sessions 50 --turns 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+import uuid
+import websockets
+
+RESUME_LINES = [
+    "Jane Doe - Software Engineer",
+    "Experience: Backend Engineer at Example Corp, 2019-2024",
+    "Built REST APIs in Python and FastAPI serving 10k requests per second",
+    "Designed PostgreSQL schemas and reduced query latency by 40 percent",
+    "Education: B.Tech Computer Science",
+    "Skills: Python, FastAPI, PostgreSQL, Redis, React, Docker",
+]
+
+ANSWERS = [
+    "I built the ingestion service in FastAPI and used Redis as a queue between the stages.",
+    "We profiled the slow endpoints first and then added the missing composite index.",
+    "I would start from the logs and metrics around the failure and try to narrow down the inputs.",
+    "We disagreed about the schema, so I wrote a short design doc and we benchmarked both options.",
+    "I would use a token bucket per API key stored in Redis with a small burst allowance.",
+]
+
+def make_resume_pdf(candidate: int = None) -> bytes:
+    """
+    Builds a small single-page PDF with real text, so the server parses it normally.
+    With a candidate number the name line differs, so each candidate's upload
+    misses the server's analysis cache like a real resume would.
+    """
+    lines = list(RESUME_LINES)
+    if candidate is not None:
+        lines[0] = f"Jane Doe {candidate} - Software Engineer"
+    text_ops = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(text_ops)} >>\nstream\n{text_ops}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_at = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("latin-1")
+    return pdf
+
+def upload_resume(base_url: str, pdf: bytes) -> dict:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + pdf + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(
+        f"{base_url}/analyze-resume",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())
+
+class Results:
+    def __init__(self):
+        self.upload = []
+        self.first_text = []
+        self.first_audio = []
+        self.turn = []
+        self.errors = 0
+        self.turns_completed = 0
+
+async def receive_turn(ws, sent_at: float, results: Results, idle_timeout: float):
+    """
+    Reads one interviewer reply. The reply is complete once the final "text"
+    message has arrived and no more audio follows for idle_timeout seconds.
+    """
+    first_text = first_audio = None
+    final_text = False
+    while True:
+        try:
+            frame = await asyncio.wait_for(ws.recv(), timeout=idle_timeout if final_text else 120)
+        except asyncio.TimeoutError:
+            if final_text:
+                break
+            raise
+        now = time.perf_counter()
+        if isinstance(frame, bytes):
+            first_audio = first_audio or now
+            continue
+        message = json.loads(frame)
+        if message.get("type") in ("text", "text_delta"):
+            first_text = first_text or now
+        if message.get("type") == "text":
+            final_text = True
+            results.turn.append(now - sent_at)
+    if first_text:
+        results.first_text.append(first_text - sent_at)
+    if first_audio:
+        results.first_audio.append(first_audio - sent_at)
+
+async def run_candidate(index: int, args, pdf: bytes, results: Results):
+    started = time.perf_counter()
+    try:
+        analysis = await asyncio.to_thread(upload_resume, args.url, pdf)
+        results.upload.append(time.perf_counter() - started)
+        session_id = analysis["session_id"]
+
+        ws_url = args.url.replace("http", "ws", 1)
+        query = f"persona=balanced&type=mixed&difficulty=mid&duration=15&stream={str(args.stream).lower()}&protocol={args.protocol}"
+        async with websockets.connect(f"{ws_url}/ws/interview/{session_id}?{query}", max_size=None) as ws:
+            # The greeting counts as turn zero
+            await receive_turn(ws, time.perf_counter(), Results(), args.idle_timeout)
+            for turn in range(args.turns):
+                await asyncio.sleep(args.think_time)
+                sent_at = time.perf_counter()
+                answer = ANSWERS[(index + turn) % len(ANSWERS)]
+                await ws.send(json.dumps({"type": "transcript", "content": answer}))
+                await receive_turn(ws, sent_at, results, args.idle_timeout)
+                results.turns_completed += 1
+    except Exception as e:
+        results.errors += 1
+        print(f"candidate {index} failed: {type(e).__name__}: {e}")
+
+def percentiles(values: list) -> str:
+    if not values:
+        return "n/a"
+    if len(values) == 1:
+        return f"p50={values[0] * 1000:.0f}ms"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return f"p50={cuts[49] * 1000:.0f}ms p95={cuts[94] * 1000:.0f}ms p99={cuts[98] * 1000:.0f}ms (n={len(values)})"
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent candidates")
+    parser.add_argument("--turns", type=int, default=5, help="transcript turns per candidate")
+    parser.add_argument("--think-time", type=float, default=1.0, help="seconds between reply and next answer")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which candidates start")
+    parser.add_argument("--workers", type=int, default=1, help="server worker count, for per-worker throughput")
+    parser.add_argument("--idle-timeout", type=float, default=0.5, help="quiet time that ends a reply")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--protocol", type=int, choices=(1, 2), default=2, help="1 = raw audio frames, 2 = framed")
+    parser.add_argument("--same-resume", action="store_true",
+                        help="upload one resume for every candidate (measures analysis cache hits)")
+    args = parser.parse_args()
+
+    results = Results()
+    started = time.perf_counter()
+
+    async def start(index: int):
+        await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+        pdf = make_resume_pdf(None if args.same_resume else index)
+        await run_candidate(index, args, pdf, results)
+
+    await asyncio.gather(*(start(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{args.sessions} candidates x {args.turns} turns in {elapsed:.1f}s, {results.errors} failed")
+    print(f"upload (analyze-resume): {percentiles(results.upload)}" + (" (same resume, cached after the first)" if args.same_resume else ""))
+    print(f"time to first text:      {percentiles(results.first_text)}")
+    print(f"time to first audio:     {percentiles(results.first_audio)}")
+    print(f"turn (until full text):  {percentiles(results.turn)}")
+    throughput = results.turns_completed / elapsed
+    print(f"throughput: {throughput:.2f} turns/s total, {throughput / args.workers:.2f} turns/s per worker")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Cold-start benchmark for the interview server.
+
+Each run starts a fresh interpreter and measures:
+  - import:   time to `import main` (config, services, FastAPI app)
+  - ready:    from launching uvicorn until GET /ready returns 200
+  - first ws: from launching uvicorn until a new interview WebSocket delivers
+              its first message (includes one /analyze-resume upload)
+
+By default the server runs against the local stand-ins (LLM_BACKEND=fake,
+TTS_BACKEND=fake) so the numbers measure this service, not network calls.
+Pass --no-fake to start it with the environment as-is:
+
+    python tools/startup_bench.py --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import websockets
+from loadtest import make_resume_pdf, upload_resume
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_ENV = {
+    "LLM_BACKEND": "fake",
+    "TTS_BACKEND": "fake",
+    "FAKE_LLM_LATENCY_MS": "0",
+    "FAKE_LLM_TOKENS_PER_SECOND": "100000",
+    "FAKE_TTS_LATENCY_MS": "0",
+    "PERSISTENCE_URL": "none",
+}
+
+def server_env(fake: bool) -> dict:
+    env = dict(os.environ)
+    if fake:
+        env.update(FAKE_ENV)
+    return env
+
+def measure_import(env: dict) -> float:
+    code = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def get_ready(base_url: str) -> bool:
+    try:
+        with urllib.request.urlopen(f"{base_url}/ready", timeout=1) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return False
+
+async def first_ws_message(base_url: str, pdf: bytes):
+    analysis = await asyncio.to_thread(upload_resume, base_url, pdf)
+    ws_url = base_url.replace("http", "ws", 1)
+    async with websockets.connect(f"{ws_url}/ws/interview/{analysis['session_id']}?protocol=2", max_size=None) as ws:
+        json.loads(await ws.recv())
+
+async def measure_startup(port: int, env: dict, pdf: bytes, timeout: float) -> tuple[float, float]:
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while not await asyncio.to_thread(get_ready, base_url):
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"server not ready after {timeout:.0f}s")
+            await asyncio.sleep(0.02)
+        ready = time.perf_counter() - started
+        await first_ws_message(base_url, pdf)
+        return ready, time.perf_counter() - started
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+def summary(values: list) -> str:
+    return (f"median={statistics.median(values) * 1000:.0f}ms "
+            f"min={min(values) * 1000:.0f}ms max={max(values) * 1000:.0f}ms (n={len(values)})")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765, help="first port; each run uses the next one")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for /ready")
+    parser.add_argument("--fake", action=argparse.BooleanOptionalAction, default=True,
+                        help="run the server against the local LLM/TTS stand-ins")
+    args = parser.parse_args()
+
+    env = server_env(args.fake)
+    pdf = make_resume_pdf()
+    imports, ready, first_ws = [], [], []
+    for run in range(args.runs):
+        imports.append(await asyncio.to_thread(measure_import, env))
+        run_ready, run_ws = await measure_startup(args.port + run, env, pdf, args.timeout)
+        ready.append(run_ready)
+        first_ws.append(run_ws)
+        print(f"run {run + 1}: import={imports[-1] * 1000:.0f}ms ready={run_ready * 1000:.0f}ms first ws={run_ws * 1000:.0f}ms")
+
+    print(f"\nimport main:    {summary(imports)}")
+    print(f"until ready:    {summary(ready)}")
+    print(f"until first ws: {summary(first_ws)}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -157,6 +157,7 @@ export default function InterviewRoom() {
     // Interview hook
     const {
         isConnected,
+        queueStatus,
         aiMessage,
         isAiSpeaking,
         connect,
@@ -391,7 +392,7 @@ export default function InterviewRoom() {
             disconnect();
 
             // Call backend to generate report
-            const response = await fetch(`${getBackendUrl()}/end-interview/${sessionId}`, {
+            const response = await fetch(`${getBackendUrl()}/end-interview/${sessionId}?stream=true`, {
                 method: 'POST'
             });
 
@@ -399,7 +400,23 @@ export default function InterviewRoom() {
                 throw new Error('Failed to generate report');
             }
 
-            const data = await response.json();
+            let data: { report?: string; analysis?: string; error?: string };
+            if (response.body && !response.headers.get('content-type')?.includes('application/json')) {
+                // Streamed markdown - show the report as it is written
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let streamedReport = '';
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    streamedReport += decoder.decode(value, { stream: true });
+                    setReport(streamedReport);
+                    setInterviewEnded(true);
+                }
+                data = { report: streamedReport };
+            } else {
+                data = await response.json();
+            }
             if (data.report) {
                 setReport(data.report);
                 setAnalysis(data.analysis || '');
@@ -982,7 +999,7 @@ export default function InterviewRoom() {
                                         {isAiSpeaking ? <Volume2 className="w-4 h-4 text-blue-300 animate-pulse" /> : <VolumeX className="w-4 h-4 text-neutral-500" />}
                                     </p>
                                     <p className="text-sm text-indigo-200">
-                                        {isConnected ? (isAiSpeaking ? 'Speaking...' : 'Listening...') : 'Connecting...'}
+                                        {isConnected ? (isAiSpeaking ? 'Speaking...' : 'Listening...') : queueStatus ? `Waiting for a free interviewer (#${queueStatus.position}, ~${Math.max(1, Math.round(queueStatus.estimatedWaitSeconds / 60))} min)` : 'Connecting...'}
                                     </p>
                                 </div>
 
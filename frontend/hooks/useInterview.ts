@@ -2,6 +2,31 @@
 
 import { useState, useEffect, useRef, useCallback } from 'react';
 
+// Framed binary protocol (backend/managers/framing.py): a 12-byte header of
+// version, kind, codec, flags (1 byte each), message id and seq (uint32, big endian)
+const PROTOCOL_VERSION = 2;
+const HEADER_SIZE = 12;
+const FRAME_AUDIO = 1;
+const FRAME_PING = 2;
+const FRAME_CANCEL = 4;
+
+// Opus/WebM is roughly half the size of MP3 for speech; the server falls back to MP3 when it
+// cannot transcode, and decodeAudioData handles either
+const preferredAudioFormat = (): string => {
+    if (typeof window === 'undefined') {
+        return 'mp3';
+    }
+    return new Audio().canPlayType('audio/webm; codecs="opus"') ? 'opus' : 'mp3';
+};
+
+const encodeFrame = (kind: number, messageId: number): ArrayBuffer => {
+    const header = new DataView(new ArrayBuffer(HEADER_SIZE));
+    header.setUint8(0, PROTOCOL_VERSION);
+    header.setUint8(1, kind);
+    header.setUint32(4, messageId);
+    return header.buffer;
+};
+
 interface UseInterviewOptions {
     sessionId: string | null;
     persona?: string;
@@ -13,8 +38,15 @@ interface UseInterviewOptions {
     onError?: (error: string) => void;
 }
 
+// Set while the server is at capacity and this interview is waiting for a slot
+export interface QueueStatus {
+    position: number;
+    estimatedWaitSeconds: number;
+}
+
 interface UseInterviewReturn {
     isConnected: boolean;
+    queueStatus: QueueStatus | null;
     aiMessage: string;
     isAiSpeaking: boolean;
     connect: () => void;
@@ -36,14 +68,24 @@ export const useInterview = ({
     const [isConnected, setIsConnected] = useState(false);
     const [aiMessage, setAiMessage] = useState('');
     const [isAiSpeaking, setIsAiSpeaking] = useState(false);
+    const [queueStatus, setQueueStatus] = useState<QueueStatus | null>(null);
 
     const wsRef = useRef<WebSocket | null>(null);
     const audioContextRef = useRef<AudioContext | null>(null);
     const audioQueueRef = useRef<ArrayBuffer[]>([]);
     const isPlayingRef = useRef(false);
+    const currentSourceRef = useRef<AudioBufferSourceNode | null>(null);
     const pingIntervalRef = useRef<NodeJS.Timeout | null>(null);
     const shouldReconnectRef = useRef(false);
     const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+    const streamingTextRef = useRef('');
+    // Resume state: token issued by the server and the last message sequence number seen
+    const resumeTokenRef = useRef<string | null>(null);
+    const lastSeqRef = useRef(0);
+    // Protocol confirmed by the server, the reply currently arriving, and the newest one we talked over
+    const protocolRef = useRef(1);
+    const messageIdRef = useRef(0);
+    const cancelledThroughRef = useRef(0);
 
     // Get backend URL from environment or default
     // For production: Uses NEXT_PUBLIC_BACKEND_URL and converts to WebSocket protocol
@@ -89,11 +131,13 @@ export const useInterview = ({
             source.buffer = audioBuffer;
             source.connect(audioContext.destination);
 
+            currentSourceRef.current = source;
             source.onended = () => {
-                setIsAiSpeaking(false);
-                onAiSpeaking?.(false);
-
-                // Play next in queue if available
+                if (currentSourceRef.current === source) {
+                    currentSourceRef.current = null;
+                }
+                // Play next in queue if available. Streamed replies arrive as one
+                // chunk per sentence, so only stop "speaking" once the queue drains
                 if (audioQueueRef.current.length > 0) {
                     const nextAudio = audioQueueRef.current.shift();
                     if (nextAudio) {
@@ -101,6 +145,8 @@ export const useInterview = ({
                     }
                 } else {
                     isPlayingRef.current = false;
+                    setIsAiSpeaking(false);
+                    onAiSpeaking?.(false);
                 }
             };
 
@@ -123,6 +169,20 @@ export const useInterview = ({
         }
     }, [playAudio]);
 
+    // Barge-in: the candidate is answering, so stop the current reply's audio
+    // and tell the server not to send the rest of it
+    const interruptAudio = useCallback(() => {
+        if (messageIdRef.current <= cancelledThroughRef.current) {
+            return;
+        }
+        audioQueueRef.current = [];
+        currentSourceRef.current?.stop();
+        cancelledThroughRef.current = messageIdRef.current;
+        if (protocolRef.current === PROTOCOL_VERSION && wsRef.current?.readyState === WebSocket.OPEN) {
+            wsRef.current.send(encodeFrame(FRAME_CANCEL, messageIdRef.current));
+        }
+    }, []);
+
     // Connect to WebSocket
     const connect = useCallback(() => {
         if (!sessionId) {
@@ -137,12 +197,17 @@ export const useInterview = ({
         }
 
         const backendUrl = getBackendUrl();
-        const wsUrl = `${backendUrl}/ws/interview/${sessionId}?persona=${persona}&type=${interviewType}&difficulty=${difficulty}&duration=${duration}`;
+        let wsUrl = `${backendUrl}/ws/interview/${sessionId}?persona=${persona}&type=${interviewType}&difficulty=${difficulty}&duration=${duration}&stream=true&protocol=${PROTOCOL_VERSION}&audio=${preferredAudioFormat()}`;
+        if (resumeTokenRef.current) {
+            // Reattach to the running interview and only receive what we missed
+            wsUrl += `&resume_token=${encodeURIComponent(resumeTokenRef.current)}&last_seq=${lastSeqRef.current}`;
+        }
 
         console.log('Connecting to WebSocket:', wsUrl);
 
         try {
             const ws = new WebSocket(wsUrl);
+            ws.binaryType = 'arraybuffer';
 
             ws.onopen = () => {
                 console.log('WebSocket connected');
@@ -154,22 +219,80 @@ export const useInterview = ({
                     clearInterval(pingIntervalRef.current);
                 }
                 pingIntervalRef.current = setInterval(() => {
-                    if (ws.readyState === WebSocket.OPEN) {
+                    if (ws.readyState !== WebSocket.OPEN) {
+                        return;
+                    }
+                    if (protocolRef.current === PROTOCOL_VERSION) {
+                        ws.send(encodeFrame(FRAME_PING, 0));
+                    } else {
                         ws.send(JSON.stringify({ type: 'ping' }));
                     }
                 }, 25000); // Ping every 25 seconds
             };
 
             ws.onmessage = async (event) => {
-                if (event.data instanceof Blob) {
-                    // Binary data = audio
-                    const arrayBuffer = await event.data.arrayBuffer();
-                    queueAudio(arrayBuffer);
+                if (event.data instanceof ArrayBuffer) {
+                    if (protocolRef.current !== PROTOCOL_VERSION) {
+                        // Older server: raw audio, numbered implicitly
+                        lastSeqRef.current += 1;
+                        queueAudio(event.data);
+                        return;
+                    }
+                    const header = new DataView(event.data, 0, HEADER_SIZE);
+                    if (header.getUint8(1) !== FRAME_AUDIO) {
+                        return; // pong
+                    }
+                    const messageId = header.getUint32(4);
+                    lastSeqRef.current = header.getUint32(8);
+                    messageIdRef.current = Math.max(messageIdRef.current, messageId);
+                    if (messageId > cancelledThroughRef.current) {
+                        queueAudio(event.data.slice(HEADER_SIZE));
+                    }
                 } else {
                     // Text data = JSON message
                     try {
                         const data = JSON.parse(event.data);
-                        if (data.type === 'text') {
+                        if (typeof data.seq === 'number') {
+                            lastSeqRef.current = data.seq;
+                        }
+                        if (typeof data.id === 'number') {
+                            if (data.id !== messageIdRef.current) {
+                                streamingTextRef.current = '';  // a new reply has started
+                            }
+                            messageIdRef.current = data.id;
+                        }
+                        if (data.type === 'queued') {
+                            // Connected, but the interview starts once the server has a free slot
+                            setIsConnected(false);
+                            setQueueStatus({ position: data.position, estimatedWaitSeconds: data.estimated_wait_seconds });
+                        } else if (data.type === 'busy') {
+                            setQueueStatus(null);
+                            onError?.('The interview server is busy, retrying shortly');
+                        } else if (data.type === 'session') {
+                            setIsConnected(true);
+                            setQueueStatus(null);
+                            protocolRef.current = data.protocol ?? 1;
+                            if (!data.resumed) {
+                                // Fresh interview - numbering starts over
+                                lastSeqRef.current = 0;
+                                messageIdRef.current = 0;
+                                cancelledThroughRef.current = 0;
+                                streamingTextRef.current = '';
+                            }
+                            resumeTokenRef.current = data.resume_token;
+                        } else if (data.type === 'cancel') {
+                            // The server dropped this reply because the candidate kept talking
+                            cancelledThroughRef.current = Math.max(cancelledThroughRef.current, data.id);
+                            audioQueueRef.current = [];
+                            currentSourceRef.current?.stop();
+                            streamingTextRef.current = '';
+                        } else if (data.type === 'text_delta') {
+                            // Streamed reply in progress - show it as it is written
+                            streamingTextRef.current += data.content;
+                            setAiMessage(streamingTextRef.current);
+                        } else if (data.type === 'text') {
+                            // Complete reply (also sent at the end of a stream)
+                            streamingTextRef.current = '';
                             setAiMessage(data.content);
                             onAiMessage?.(data.content);
                         }
@@ -196,12 +319,14 @@ export const useInterview = ({
 
                 // Auto-reconnect if unexpected close and we should still be connected
                 if (shouldReconnectRef.current && event.code !== 1000) {
-                    console.log('Attempting to reconnect in 2 seconds...');
+                    // 1013: the server is full or we fell behind - give it a little longer
+                    const delay = event.code === 1013 ? 10000 : 2000;
+                    console.log(`Attempting to reconnect in ${delay / 1000} seconds...`);
                     reconnectTimeoutRef.current = setTimeout(() => {
                         if (shouldReconnectRef.current) {
                             connect();
                         }
-                    }, 2000);
+                    }, delay);
                 }
             };
 
@@ -236,6 +361,7 @@ export const useInterview = ({
     // Send transcript to backend
     const sendTranscript = useCallback((text: string) => {
         if (wsRef.current?.readyState === WebSocket.OPEN) {
+            interruptAudio();
             wsRef.current.send(JSON.stringify({
                 type: 'transcript',
                 content: text
@@ -243,11 +369,12 @@ export const useInterview = ({
         } else {
             console.warn('WebSocket not connected, cannot send transcript');
         }
-    }, []);
+    }, [interruptAudio]);
 
     // Send code submission to backend
     const sendCode = useCallback((code: string, language: string) => {
         if (wsRef.current?.readyState === WebSocket.OPEN) {
+            interruptAudio();
             wsRef.current.send(JSON.stringify({
                 type: 'code_submission',
                 code: code,
@@ -257,7 +384,15 @@ export const useInterview = ({
         } else {
             console.warn('WebSocket not connected, cannot send code');
         }
-    }, []);
+    }, [interruptAudio]);
+
+    // A different session must never try to resume the previous one
+    useEffect(() => {
+        resumeTokenRef.current = null;
+        lastSeqRef.current = 0;
+        messageIdRef.current = 0;
+        cancelledThroughRef.current = 0;
+    }, [sessionId]);
 
     // Cleanup on unmount
     useEffect(() => {
@@ -271,6 +406,7 @@ export const useInterview = ({
 
     return {
         isConnected,
+        queueStatus,
         aiMessage,
         isAiSpeaking,
         connect,